@@ -0,0 +1,150 @@
+"""Per-request cost of the API access log middleware.
+
+Calls a Starlette app directly over ASGI, without a server or sockets, so
+only the middleware differs between variants:
+
+    none        no access log
+    base_http   the former `BaseHTTPMiddleware` version, for reference
+    asgi        `AccessLogMiddleware`
+
+Records go through the queue logging pipeline to /dev/null. Variants take
+turns within each of `--rounds`; reports the best mean time per request
+and the overhead over `none`.
+
+    poetry run python -m benchmarks.access_log --requests 20000
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from datetime import datetime
+
+import click
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from src.common.logging_handlers import setup_queue_logging
+from src.bases.api.middlewares import AccessLogMiddleware
+
+VARIANTS = ('none', 'base_http', 'asgi')
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    """The access log as it was before `AccessLogMiddleware`."""
+
+    def __init__(self, app, logger):
+        super().__init__(app)
+        self.logger = logger
+
+    async def dispatch(self, request, call_next):
+        start_time = time.time()
+        logging_message = '{method} - {host}:{port}'.format(
+            host=request.client.host,
+            port=request.client.port,
+            method=request.method.upper()
+        )
+        logging_data = dict(
+            timestamp=datetime.utcnow().isoformat(),
+            method=request.method.upper(),
+            url=str(request.url),
+        )
+
+        response = await call_next(request)
+
+        logging_data['status_code'] = response.status_code
+        logging_data['res_time'] = round(time.time() - start_time, 4)
+        self.logger.info(logging_message, extra=dict(data=logging_data))
+        return response
+
+
+def make_app(variant, logger):
+    async def health_check(_request):
+        return JSONResponse(dict(status='ok'))
+
+    middleware = []
+    if variant == 'base_http':
+        middleware.append(Middleware(BaseHTTPLoggingMiddleware, logger=logger))
+    elif variant == 'asgi':
+        middleware.append(Middleware(AccessLogMiddleware, logger=logger))
+    return Starlette(
+        routes=[Route('/health-check', health_check)],
+        middleware=middleware,
+    )
+
+
+async def run_requests(app, requests):
+    scope = dict(
+        type='http',
+        asgi=dict(version='3.0'),
+        http_version='1.1',
+        method='GET',
+        scheme='http',
+        path='/health-check',
+        raw_path=b'/health-check',
+        query_string=b'',
+        root_path='',
+        headers=[(b'host', b'localhost'), (b'traceparent', (
+            b'00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01'
+        ))],
+        client=('127.0.0.1', 50000),
+        server=('127.0.0.1', 8000),
+    )
+
+    async def receive():
+        return dict(type='http.request', body=b'', more_body=False)
+
+    statuses = []
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    elapsed = time.perf_counter() - started
+
+    if statuses.count(200) != requests:
+        raise AssertionError(f'{len(statuses)} responses, expected 200s')
+    return elapsed
+
+
+@click.command()
+@click.option('--requests', default=20000, show_default=True)
+@click.option('--rounds', default=5, show_default=True)
+def main(requests, rounds):
+    logger = logging.getLogger('benchmarks.access_log')
+    logger.propagate = False
+    with open(os.devnull, 'w') as devnull:
+        listener = setup_queue_logging(logger, stream=devnull)
+        try:
+            apps = {v: make_app(v, logger) for v in VARIANTS}
+            timings = {v: [] for v in VARIANTS}
+            # variants alternate within a round so load drift hits them all
+            for _ in range(rounds):
+                for variant, app in apps.items():
+                    timings[variant].append(
+                        asyncio.run(run_requests(app, requests))
+                    )
+        finally:
+            listener.stop()
+
+    result = dict(requests=requests)
+    for variant in VARIANTS:
+        result[variant] = dict(us_per_request=round(
+            min(timings[variant]) / requests * 1e6, 2
+        ))
+    for variant in VARIANTS[1:]:
+        result[variant]['overhead_us'] = round(
+            result[variant]['us_per_request']
+            - result['none']['us_per_request'], 2
+        )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
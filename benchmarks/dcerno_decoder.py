@@ -0,0 +1,110 @@
+"""Fuzz and throughput benchmark for the D-Cerno TCCP frame decoder.
+
+Encodes a stream of `units` replies and `micstat` pushes, then feeds it to
+`FrameDecoder` cut at random points (fragmented) and in large batches
+(coalesced), with garbage and truncated frames mixed in. Every run checks
+that exactly the valid frames come out, in order.
+
+    poetry run python -m benchmarks.dcerno_decoder --frames 20000
+"""
+import json
+import random
+import time
+
+import click
+
+from src.clients.dcerno import DcernoClient, FrameDecoder
+
+
+def make_stream(frames, units, seed):
+    rnd = random.Random(seed)
+    chunks = []
+    expected = []
+    for i in range(frames):
+        if i % 10 == 0:
+            body = dict(
+                nam='units',
+                s=[dict(uid=str(1000 + u), stat=str(rnd.randint(0, 1)))
+                   for u in range(units)]
+            )
+            packet_type = 'rep'
+        else:
+            body = dict(
+                nam='micstat',
+                uid=str(1000 + rnd.randrange(units)),
+                stat=str(rnd.randint(0, 1))
+            )
+            packet_type = 'ntf'
+        packet_id = f'{i % 10000:04d}'
+        packet = DcernoClient.mapping_payload(
+            packet_type, packet_id, '02', json.dumps(body)
+        ).encode('ascii')
+
+        noise = rnd.random()
+        if noise < 0.01:
+            # truncated frame, must be dropped without losing the next one
+            chunks.append(packet[:rnd.randrange(1, len(packet) - 1)])
+        elif noise < 0.02:
+            chunks.append(b'\r\n garbage \r\n')
+
+        chunks.append(packet)
+        expected.append((packet_type, packet_id, body))
+    return b''.join(chunks), expected
+
+
+def split_stream(stream, mode, rnd):
+    if mode == 'fragmented':
+        sizes = (1, 7, 64, 536, 1460)
+    else:
+        sizes = (16384, 65536)
+    position = 0
+    while position < len(stream):
+        size = rnd.choice(sizes)
+        yield stream[position:position + size]
+        position += size
+
+
+def run_once(stream, expected, mode, seed):
+    rnd = random.Random(seed)
+    pieces = list(split_stream(stream, mode, rnd))
+    decoder = FrameDecoder()
+
+    started = time.perf_counter()
+    frames = []
+    for piece in pieces:
+        frames.extend(decoder.feed(piece))
+    elapsed = time.perf_counter() - started
+
+    got = [(f.packet_type, f.packet_id, f.body) for f in frames]
+    if got != expected:
+        raise AssertionError(
+            f'{mode}: decoded {len(got)} frames, expected {len(expected)}'
+        )
+    return elapsed, len(pieces)
+
+
+@click.command()
+@click.option('--frames', default=20000, show_default=True)
+@click.option('--units', default=60, show_default=True)
+@click.option('--rounds', default=5, show_default=True)
+@click.option('--seed', default=0, show_default=True)
+def main(frames, units, rounds, seed):
+    stream, expected = make_stream(frames, units, seed)
+    result = dict(frames=frames, units=units, bytes=len(stream))
+    for mode in ('fragmented', 'coalesced'):
+        timings = []
+        for r in range(rounds):
+            elapsed, pieces = run_once(stream, expected, mode, seed + r)
+            timings.append(elapsed)
+        best = min(timings)
+        result[mode] = dict(
+            reads=pieces,
+            best_s=round(best, 4),
+            frames_per_s=round(frames / best),
+            mib_per_s=round(len(stream) / best / 2 ** 20, 1),
+        )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""End-to-end latency of the tracker: mic on -> `poscall` at the camera.
+
+Runs the D-Cerno and VHD emulators, the real clients and the tracking
+orchestrator on one event loop. Every scenario switches the speaker
+`--events` times at a given rate, and measures the time from the
+`micstat` push to the matching `poscall` reaching the camera.
+
+Faults:
+    slow_camera     every camera response takes `--slow-latency` seconds
+    dropped_socket  the central unit drops all connections half way
+
+    poetry run python -m benchmarks.tracking_latency --output latency.json
+    poetry run python -m benchmarks.tracking_latency -u 40 -r 5 -f none
+"""
+import os
+import json
+import time
+import random
+import shutil
+import asyncio
+import tempfile
+
+import click
+import uvicorn
+
+from src.emulators.dcerno import DcernoEmulator
+from src.emulators.vhd import CameraEmulator, create_app
+from src.tracking import Orchestrator
+from src.tracking.replay import percentile
+
+FAULTS = ('none', 'slow_camera', 'dropped_socket')
+
+
+async def start_camera(camera, port):
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(camera),
+        host='127.0.0.1',
+        port=port,
+        log_level='warning',
+    ))
+    task = asyncio.ensure_future(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    return server, task
+
+
+def make_room(directory, units, dcerno_port, camera_uri):
+    mapping = {uid: str(index % 254 + 1) for index, uid in enumerate(units)}
+    mapping_path = os.path.join(directory, 'mapping.json')
+    setting_path = os.path.join(directory, 'settings.json')
+    with open(mapping_path, 'w') as f:
+        json.dump(mapping, f)
+    with open(setting_path, 'w') as f:
+        json.dump(dict(tracking_enabled=True), f)
+    room = dict(
+        name='bench',
+        dcerno=dict(host='127.0.0.1', port=dcerno_port),
+        cameras=dict(main=camera_uri),
+        mapping_path=mapping_path,
+        setting_path=setting_path,
+    )
+    return room, mapping
+
+
+def match_latencies(pushes, commands):
+    """Pairs each mic-on push with the first `poscall` of its preset.
+
+    A command only answers a push if it arrives before the same preset is
+    pushed again; pushes without one are counted as missed.
+    """
+    latencies = []
+    missed = 0
+    for index, (pushed_at, preset) in enumerate(pushes):
+        until = next(
+            (t for t, p in pushes[index + 1:] if p == preset),
+            float('inf')
+        )
+        arrived_at = next(
+            (c['t'] for c in commands
+             if c['action'] == 'poscall' and c['args'][:1] == [preset]
+             and pushed_at <= c['t'] < until),
+            None
+        )
+        if arrived_at is None:
+            missed += 1
+        else:
+            latencies.append((arrived_at - pushed_at) * 1000)
+    return latencies, missed
+
+
+async def run_scenario(units, rate, fault, events, slow_latency, port, seed):
+    rnd = random.Random(seed)
+    emulator = await DcernoEmulator(port=0, units=units, seed=seed).start()
+    camera = CameraEmulator(
+        latency=slow_latency if fault == 'slow_camera' else 0.0,
+        settle=0.0,
+        seed=seed,
+    )
+    server, server_task = await start_camera(camera, port)
+
+    directory = tempfile.mkdtemp(prefix='tracking-latency-')
+    room, mapping = make_room(
+        directory, list(emulator.units), emulator.port,
+        f'http://127.0.0.1:{port}'
+    )
+    orchestrator = Orchestrator(
+        rooms=[room],
+        tracking_config=dict(
+            mode='event',
+            reconcile_interval=30,
+            poll_interval=0.5,
+        ),
+    )
+    tracker_task = asyncio.ensure_future(orchestrator.run())
+
+    try:
+        while not emulator.connections:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)
+
+        pushes = []
+        uids = list(emulator.units)
+        speaker = None
+        for index in range(events):
+            if fault == 'dropped_socket' and index == events // 2:
+                emulator.drop_connections()
+            candidates = [uid for uid in uids if uid != speaker]
+            if speaker is not None:
+                emulator.push(speaker, '0')
+            speaker = rnd.choice(candidates)
+            pushes.append((time.monotonic(), mapping[speaker]))
+            emulator.push(speaker, '1')
+            await asyncio.sleep(1 / rate)
+
+        # let the last commands and a reconnection land
+        await asyncio.sleep(max(1.0, slow_latency * 2))
+    finally:
+        tracker_task.cancel()
+        await asyncio.gather(tracker_task, return_exceptions=True)
+        await emulator.close()
+        server.should_exit = True
+        await server_task
+        shutil.rmtree(directory, ignore_errors=True)
+
+    commands = list(camera.commands)
+    latencies, missed = match_latencies(pushes, commands)
+    return dict(
+        units=units,
+        rate=rate,
+        fault=fault,
+        events=events,
+        matched=len(latencies),
+        missed=missed,
+        camera_commands=camera.stats['commands'],
+        redundant=camera.stats['redundant'],
+        interrupted=camera.stats['interrupted'],
+        latency_ms=dict(
+            p50=round(percentile(latencies, 50) or 0, 3),
+            p90=round(percentile(latencies, 90) or 0, 3),
+            p99=round(percentile(latencies, 99) or 0, 3),
+            max=round(max(latencies or [0]), 3),
+        ),
+    )
+
+
+async def run_all(units_list, rates, faults, events, slow_latency, port,
+                  seed):
+    results = []
+    for units in units_list:
+        for rate in rates:
+            for fault in faults:
+                # a camera port per scenario keeps the shared clients apart
+                result = await run_scenario(
+                    units, rate, fault, events, slow_latency,
+                    port + len(results), seed
+                )
+                results.append(result)
+                click.echo(json.dumps(result), err=True)
+    return results
+
+
+@click.command()
+@click.option('-u', '--units', 'units_list', multiple=True, type=int,
+              default=(4, 40, 200), show_default=True)
+@click.option('-r', '--rate', 'rates', multiple=True, type=float,
+              default=(2.0, 10.0), show_default=True,
+              help='Speaker changes per second.')
+@click.option('-f', '--fault', 'faults', multiple=True,
+              type=click.Choice(FAULTS), default=FAULTS, show_default=True)
+@click.option('--events', default=20, show_default=True)
+@click.option('--slow-latency', default=0.3, show_default=True)
+@click.option('--port', default=18088, show_default=True,
+              help='Camera port of the first scenario, then +1 each.')
+@click.option('--seed', default=0, show_default=True)
+@click.option('--output', default=None, type=click.Path(dir_okay=False))
+def main(units_list, rates, faults, events, slow_latency, port, seed,
+         output):
+    results = asyncio.run(run_all(
+        units_list, rates, faults, events, slow_latency, port, seed
+    ))
+
+    report = dict(
+        created_at=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        scenarios=results,
+    )
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,3 @@
-import yaml
 import os
 from pathlib import Path
 import json
@@ -8,6 +7,8 @@ ROOT_PATH = os.path.dirname(__file__)
 CONFIG_FILE_PATH = os.path.join(ROOT_PATH, 'env.yaml')
 
 if os.path.exists(CONFIG_FILE_PATH):
+    import yaml
+
     with open(CONFIG_FILE_PATH, 'r') as r_file:
         data = yaml.safe_load(r_file)
 else:
@@ -15,6 +16,18 @@ else:
 
 ENVIRONMENT = data.get('ENVIRONMENT', 'local')
 DEBUG = data.get('DEBUG', False)
+# payloads of client requests and replies are only logged at DEBUG
+LOG_LEVEL = data.get('LOG_LEVEL', 'DEBUG' if DEBUG else 'INFO')
+
+# routes read at startup instead of walking the route packages, rebuilt
+# with `python -m src.bases.api.manifest`; None walks them (local default)
+ROUTE_MANIFEST = data.get(
+    'ROUTE_MANIFEST',
+    None if ENVIRONMENT == 'local'
+    else os.path.join(ROOT_PATH, 'src', 'api', 'route_manifest.json')
+)
+# fail at startup on a route that does not import instead of skipping it
+STRICT_ROUTES = data.get('STRICT_ROUTES', True)
 
 SECRET_KEY = data.get('SECRET_KEY', 'secret_key')
 
@@ -33,7 +46,9 @@ REDIS = data.get('REDIS', dict(
 DCERNO_CONFIG = data.get(
     'DCERNO_CONFIG', dict(
         host='192.168.0.20',
-        port=5011
+        port=5011,
+        # connections of the blocking client, requests are multiplexed
+        pool_size=1,
     )
 )
 VHD_CONFIG = data.get(
@@ -42,6 +57,33 @@ VHD_CONFIG = data.get(
     )
 )
 
+# mode: `event` reacts to pushed micstat frames and reconciles with a
+# `gunits` request every `reconcile_interval` seconds, `poll` requests
+# `gunits` every `poll_interval` seconds.
+# selector: see `DefaultSpeakerSelector`, times in seconds; a room can
+# override it with its own `selector` entry.
+# record_dir: when set, every room logs frames and camera commands there
+# for `replay.py`.
+TRACKING_CONFIG = data.get(
+    'TRACKING_CONFIG', dict(
+        mode='event',
+        reconcile_interval=30,
+        poll_interval=1,
+        selector=dict(
+            min_active=0,
+            min_hold=0,
+            home_delay=0,
+            priority_uids=[],
+            mode='first',
+        ),
+        record_dir=None,
+        # reconnection delays in seconds: initial * 2 ** n, capped
+        backoff=dict(initial=0.1, maximum=5.0),
+        # `GET /metrics` of the tracker process, None to disable
+        metrics_port=9108,
+    )
+)
+
 DECERNO_VHD_MAPPING_PATH = data.get(
     'DECERNO_VHD_MAPPING_PATH',
     os.path.join(Path.home() / 'Documents', 'decerno_vhd_camera_config.json')
@@ -52,6 +94,26 @@ DECERNO_VHD_SETTING_PATH = data.get(
     os.path.join(Path.home() / 'Documents', 'decerno_vhd_settings.json'))
 
 
+# Rooms run by the tracking orchestrator, each with its own central unit,
+# cameras (id -> uri, first one is the default) and mapping file.
+ROOMS = data.get('ROOMS', [
+    dict(
+        name='default',
+        dcerno=DCERNO_CONFIG,
+        cameras=dict(main=VHD_CONFIG['uri']),
+        mapping_path=DECERNO_VHD_MAPPING_PATH,
+        setting_path=DECERNO_VHD_SETTING_PATH,
+    )
+])
+
+# cameras of the room whose mapping the API edits, id -> uri
+API_CAMERAS = next(
+    (room['cameras'] for room in ROOMS
+     if room.get('mapping_path') == DECERNO_VHD_MAPPING_PATH),
+    dict(main=VHD_CONFIG['uri'])
+)
+
+
 class CeleryConfig(object):
     env = ENVIRONMENT
 
@@ -0,0 +1,53 @@
+"""Replays a tracker log recorded with `TRACKING_CONFIG['record_dir']`.
+
+    poetry run python replay.py records/default-20240101-100000.jsonl
+    poetry run python replay.py LOG --speed 10 --selector '{"min_hold": 5}'
+"""
+import json
+
+import click
+
+from config import TRACKING_CONFIG
+from src.tracking.recorder import read_log
+from src.tracking.replay import ReplaySimulator
+from src.tracking.selectors import DefaultSpeakerSelector
+
+
+@click.command()
+@click.argument('log_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--speed', default=0.0, show_default=True,
+              help='1 replays in real time, N at N times, 0 at full speed.')
+@click.option('--selector', 'selector_json', default=None,
+              help='JSON overriding TRACKING_CONFIG selector settings.')
+@click.option('--mapping', 'mapping_path', default=None,
+              type=click.Path(exists=True, dir_okay=False),
+              help='Mapping file to use instead of the recorded one.')
+@click.option('--output', default=None, type=click.Path(dir_okay=False),
+              help='Also write the report to this JSON file.')
+def run(log_path, speed, selector_json, mapping_path, output):
+    config = dict(TRACKING_CONFIG.get('selector') or dict())
+    if selector_json:
+        config.update(json.loads(selector_json))
+
+    mapping = None
+    if mapping_path:
+        with open(mapping_path, 'r') as f:
+            mapping = json.load(f)
+
+    report = ReplaySimulator(
+        read_log(log_path),
+        selector=DefaultSpeakerSelector(**config),
+        mapping=mapping,
+        speed=speed,
+    ).run()
+    report['selector'] = config
+
+    text = json.dumps(report, indent=2)
+    click.echo(text)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text)
+
+
+if __name__ == '__main__':
+    run()
@@ -1,9 +1,11 @@
 import logging
 
 from src.bases.api.generators import ApiGenerator
-from src.bases.api.middlewares import LoggingMiddleware
+from src.bases.api.middlewares import AccessLogMiddleware
+from src.clients.dcerno import AsyncDcernoClient
 
-from config import (REDIS, MONGO_URI)
+from config import (REDIS, MONGO_URI, LOG_LEVEL, ROUTE_MANIFEST,
+                    STRICT_ROUTES)
 
 from . import v1
 
@@ -13,7 +15,11 @@ generator = ApiGenerator(
     router_modules=[v1],
     redis_config=REDIS,
     logger=logging.root,
-    middlewares=[LoggingMiddleware],
+    log_level=LOG_LEVEL,
+    route_manifest=ROUTE_MANIFEST,
+    strict_routes=STRICT_ROUTES,
+    middlewares=[AccessLogMiddleware],
+    on_shutdown=[AsyncDcernoClient.close_shared],
 )
 
 app = generator.run('DcernoVHD')
@@ -0,0 +1,28 @@
+from src.bases.api.routes import Route
+from .logic_handlers import (CameraJobCreateLogicHandler,
+                             CameraJobLogicHandler,
+                             CameraJobCancelLogicHandler)
+
+
+class CameraJobCreateRoute(Route):
+    auth = False
+    path = "/cameras/jobs"
+    method = "post"
+
+    logic_handler_class = CameraJobCreateLogicHandler
+
+
+class CameraJobRoute(Route):
+    auth = False
+    path = "/cameras/jobs/{job_id}"
+    method = "get"
+
+    logic_handler_class = CameraJobLogicHandler
+
+
+class CameraJobCancelRoute(Route):
+    auth = False
+    path = "/cameras/jobs/{job_id}"
+    method = "delete"
+
+    logic_handler_class = CameraJobCancelLogicHandler
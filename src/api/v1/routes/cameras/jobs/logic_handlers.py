@@ -0,0 +1,38 @@
+from fastapi import Body
+
+from src.bases.api.routes import RouteLogicHandler
+from src.bases.error.api import BadRequestParams, NotFound
+from src.bases.error.base import BaseError
+from src.services.camera_jobs import camera_jobs
+from src.services.cameras import camera_uri
+
+
+class CameraJobCreateLogicHandler(RouteLogicHandler):
+    async def run(self, steps: list[dict] = Body(..., embed=True),
+                  replace: bool = True, camera: str = None):
+        try:
+            job = camera_jobs.submit(
+                uri=camera_uri(camera),
+                steps=steps,
+                logger=self.logger,
+                replace=replace,
+            )
+        except BaseError as e:
+            raise BadRequestParams(message=e.message)
+        return job.to_dict()
+
+
+class CameraJobLogicHandler(RouteLogicHandler):
+    async def run(self, job_id: str):
+        job = camera_jobs.get(job_id)
+        if job is None:
+            raise NotFound(message='camera job not found')
+        return job.to_dict()
+
+
+class CameraJobCancelLogicHandler(RouteLogicHandler):
+    async def run(self, job_id: str):
+        job = camera_jobs.cancel(job_id)
+        if job is None:
+            raise NotFound(message='camera job not found')
+        return job.to_dict()
@@ -1,27 +1,26 @@
-import time
-
 from src.bases.api.routes import RouteLogicHandler
-from src.clients.vhd import VHDClient
-from config import VHD_CONFIG
+from src.bases.error.api import BadRequestParams
+from src.bases.error.base import BaseError
+from src.services.camera_jobs import camera_jobs
+from src.services.cameras import camera_uri
 
+# home, let the camera get there, then recall preset 2
+DEMO_STEPS = [
+    dict(action='home', position='10', zoom='10'),
+    dict(wait=5),
+    dict(action='poscall', position='2'),
+]
 
-class CamerasLogicHandler(RouteLogicHandler):
-    def run(self):
-        client = VHDClient(
-            uri=VHD_CONFIG['uri'],
-            logger=self.logger
-        )
 
-        data = client.call(
-            action='home',
-            position='10',
-            zoom='10',
-        )
-        print(data)
-        time.sleep(5)
-        data = client.call(
-            action='poscall',
-            position='2',
-        )
-        print(data)
-        return data
\ No newline at end of file
+class CamerasLogicHandler(RouteLogicHandler):
+    async def run(self, camera: str = None):
+        # the sequence runs in the background, poll /cameras/jobs/{id}
+        try:
+            job = camera_jobs.submit(
+                uri=camera_uri(camera),
+                steps=DEMO_STEPS,
+                logger=self.logger,
+            )
+        except BaseError as e:
+            raise BadRequestParams(message=e.message)
+        return job.to_dict()
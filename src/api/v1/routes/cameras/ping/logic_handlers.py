@@ -1,18 +1,23 @@
 from src.bases.api.routes import RouteLogicHandler
-from src.clients.vhd import VHDClient
-from src.bases.error.client import ClientError
-from config import VHD_CONFIG
+from src.bases.error.api import BadRequestParams
+from src.bases.error.base import BaseError
+from src.clients.vhd import AsyncVHDClient
+from src.services.cameras import camera_uri
 
 
 class CameraPingLogicHandler(RouteLogicHandler):
-    def run(self):
+    async def run(self, camera: str = None):
+        try:
+            uri = camera_uri(camera)
+        except BaseError as e:
+            raise BadRequestParams(message=e.message)
         pong = False
         try:
-            client = VHDClient(
-                uri=VHD_CONFIG['uri'],
+            client = AsyncVHDClient.shared(
+                uri=uri,
                 logger=self.logger
             )
-            res = client.ping()
+            await client.ping()
             pong = True
         except Exception as e:
             pass
@@ -2,5 +2,5 @@ from src.bases.api.routes import RouteLogicHandler
 
 
 class HealthCheckLogicHandler(RouteLogicHandler):
-    def run(self):
+    async def run(self):
         return dict(success=True)
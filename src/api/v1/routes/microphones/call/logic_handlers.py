@@ -1,55 +1,47 @@
 from src.bases.api.routes import RouteLogicHandler
-from src.clients.dcerno import DcernoClient
-from src.clients.vhd import VHDClient
+from src.clients.dcerno import AsyncDcernoClient
+from src.clients.vhd import AsyncVHDClient
+from src.common.config_store import mapping_store
 from src.bases.error.api import BadRequestParams, ServerError
+from src.bases.error.base import BaseError
 from src.bases.error.client import ClientError
-from config import DCERNO_CONFIG, VHD_CONFIG, DECERNO_VHD_MAPPING_PATH
-from pathlib import Path
-import os
-import json
+from src.services.cameras import DEFAULT_CAMERA, camera_uri
+from config import DCERNO_CONFIG
 
 
 class MicrophoneCallLogicHandler(RouteLogicHandler):
-    def run(self, uid: str):
-        client = DcernoClient(
+    async def run(self, uid: str):
+        client = AsyncDcernoClient.shared(
             host=DCERNO_CONFIG['host'],
-            port=DCERNO_CONFIG['port'],
-            timeout=5
+            port=DCERNO_CONFIG['port']
         )
         try:
-            micro = client.get_microphone_status(uid)
+            micro = await client.get_microphone_status(uid, timeout=5)
         except ClientError as e:
             raise ServerError(message=e.message)
 
         if not micro:
             raise BadRequestParams(message='microphone not found')
 
-        micros = self.read()
-        position = micros.get(uid)
-        if not position:
+        target = mapping_store.get_target(uid, DEFAULT_CAMERA)
+        if not target:
             raise BadRequestParams(message='Microphone not set preset')
+        camera, position = target
+        try:
+            uri = camera_uri(camera)
+        except BaseError as e:
+            raise BadRequestParams(message=e.message)
 
-        vhd_client = VHDClient(
-            uri=VHD_CONFIG['uri'],
-            logger=self.logger
-        )
+        vhd_client = AsyncVHDClient.shared(uri=uri, logger=self.logger)
         try:
-            data = vhd_client.call(
+            result = await vhd_client.call(
                 action='poscall',
                 position=str(position),
             )
         except ClientError as e:
             raise ServerError(message=e.message)
-        return data
-
-    @staticmethod
-    def read():
-        if not os.path.exists(DECERNO_VHD_MAPPING_PATH):
-            with open(DECERNO_VHD_MAPPING_PATH, 'w') as f:
-                json.dump({}, f)
-        return json.load(open(DECERNO_VHD_MAPPING_PATH, 'r'))
 
-    @staticmethod
-    def write(data):
-        with open(DECERNO_VHD_MAPPING_PATH, 'w') as f:
-            json.dump(data, f)
+        # a newer call replaced this one before it reached the camera
+        if not result.executed:
+            return dict(success=False, status=result.status)
+        return result.response
@@ -1,19 +1,18 @@
 from src.bases.api.routes import RouteLogicHandler
-from src.clients.dcerno import DcernoClient
+from src.clients.dcerno import AsyncDcernoClient
 from config import DCERNO_CONFIG
 from src.bases.error.api import ServerError
 from src.bases.error.client import ClientError
 
 
 class MicrophoneDetailsLogicHandler(RouteLogicHandler):
-    def run(self, uid: str):
-        client = DcernoClient(
+    async def run(self, uid: str):
+        client = AsyncDcernoClient.shared(
             host=DCERNO_CONFIG['host'],
-            port=DCERNO_CONFIG['port'],
-            timeout=5
+            port=DCERNO_CONFIG['port']
         )
         try:
-            data = client.get_microphone_status(uid) or {}
+            data = await client.get_microphone_status(uid, timeout=5) or {}
         except ClientError as e:
             raise ServerError(message=e.message)
 
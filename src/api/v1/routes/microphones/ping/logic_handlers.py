@@ -1,31 +1,38 @@
+import asyncio
+
 from src.bases.api.routes import RouteLogicHandler
-from src.clients.dcerno import DcernoClient
-from src.clients.vhd import VHDClient
+from src.clients.dcerno import AsyncDcernoClient
+from src.clients.vhd import AsyncVHDClient
 from src.bases.error.client import ClientError
-from config import DCERNO_CONFIG, VHD_CONFIG
+from src.services.cameras import camera_uri
+from config import DCERNO_CONFIG
 
 
 class MicrophonesPingLogicHandler(RouteLogicHandler):
-    def run(self):
+    async def run(self):
         mic_ping = False
+        client = AsyncDcernoClient.shared(
+            host=DCERNO_CONFIG['host'],
+            port=DCERNO_CONFIG['port']
+        )
+        mic_link = client.link
         try:
-            client = DcernoClient(
-                host=DCERNO_CONFIG['host'],
-                port=DCERNO_CONFIG['port'],
-                timeout=2
-            )
-            if client.get_all_units():
+            if await asyncio.wait_for(client.get_all_units(), 2):
                 mic_ping = True
-        except ClientError as e:
+        except (ClientError, asyncio.TimeoutError) as e:
             pass
         cam_ping = False
         try:
-            client = VHDClient(
-                uri=VHD_CONFIG['uri'],
+            client = AsyncVHDClient.shared(
+                uri=camera_uri(),
                 logger=self.logger
             )
-            res = client.ping()
+            await client.ping()
             cam_ping = True
         except Exception as e:
             pass
-        return dict(mic_ping=mic_ping, cam_ping=cam_ping)
\ No newline at end of file
+        return dict(
+            mic_ping=mic_ping,
+            cam_ping=cam_ping,
+            mic_link=mic_link.to_dict(),
+        )
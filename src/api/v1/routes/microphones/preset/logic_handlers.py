@@ -1,20 +1,21 @@
 from src.bases.api.routes import RouteLogicHandler
 from src.clients.dcerno import DcernoClient
 from src.clients.vhd import VHDClient
+from src.common.config_store import MappingStore, mapping_store
 from src.bases.error.api import BadRequestParams
+from src.bases.error.base import BaseError
 from src.bases.error.client import ClientError
-from config import DCERNO_CONFIG, VHD_CONFIG, DECERNO_VHD_MAPPING_PATH
-from pathlib import Path
-import os
-import json
+from src.services.cameras import DEFAULT_CAMERA, camera_uri
+from config import DCERNO_CONFIG
 
 
 class MicrophonePresetLogicHandler(RouteLogicHandler):
-    def run(self, uid: str):
+    def run(self, uid: str, camera: str = None):
         client = DcernoClient(
             host=DCERNO_CONFIG['host'],
             port=DCERNO_CONFIG['port'],
-            timeout=5
+            timeout=5,
+            pool_size=DCERNO_CONFIG.get('pool_size', 1),
         )
         try:
             data = client.get_microphone_status(uid)
@@ -23,49 +24,65 @@ class MicrophonePresetLogicHandler(RouteLogicHandler):
         except ClientError as e:
             raise BadRequestParams(message=e.message)
 
-        vhd_client = VHDClient(
-            uri=VHD_CONFIG['uri'],
-            logger=self.logger
-        )
-        micros = self.read()
-        if not micros:
-            micros = {}
-
-        if uid in micros:
-            next_number = micros[uid]
-        else:
-            next_number = self.find_next_number(micros)
-        micros[uid] = str(next_number)
+        camera = camera or DEFAULT_CAMERA
         try:
-            data = vhd_client.call(
-                action='posset',
-                position=str(next_number),
-            )
-        except ClientError as e:
+            uri = camera_uri(camera)
+        except BaseError as e:
             raise BadRequestParams(message=e.message)
-        if not data or data['Response']['Result'] != 'Success':
-            raise BadRequestParams(message='Cannot Preset Camera')
-        self.write(micros)
+        vhd_client = VHDClient.shared(uri=uri, logger=self.logger)
+        # the number is reserved under the file lock, so concurrent
+        # operators never get the same one, and the camera is called
+        # outside it so other mapping writers do not wait for the camera
+        with mapping_store.transaction() as micros:
+            previous = micros.get(uid)
+            reserved = MappingStore.targets_of(
+                previous, DEFAULT_CAMERA
+            ).get(camera) or str(self.find_next_number(micros))
+            micros[uid] = MappingStore.with_preset(
+                previous, camera, reserved, DEFAULT_CAMERA
+            )
+            entry = micros[uid]
+
+        try:
+            self.posset(vhd_client, reserved)
+        except BaseException:
+            if previous != entry:
+                self.release(uid, entry, previous)
+            raise
 
         return dict(success=True)
 
     @staticmethod
-    def read():
-        if not os.path.exists(DECERNO_VHD_MAPPING_PATH):
-            with open(DECERNO_VHD_MAPPING_PATH, 'w') as f:
-                json.dump({}, f)
-        return json.load(open(DECERNO_VHD_MAPPING_PATH, 'r'))
+    def posset(vhd_client, position):
+        try:
+            data = vhd_client.call(action='posset', position=position)
+        except ClientError as e:
+            raise BadRequestParams(message=e.message)
+        if not data or data['Response']['Result'] != 'Success':
+            raise BadRequestParams(message='Cannot Preset Camera')
 
     @staticmethod
-    def write(data):
-        with open(DECERNO_VHD_MAPPING_PATH, 'w') as f:
-            json.dump(data, f)
+    def release(uid, entry, previous):
+        """Gives back a number reserved for a failed `posset`."""
+        with mapping_store.transaction() as micros:
+            # changed by another operator meanwhile
+            if micros.get(uid) != entry:
+                return
+            if previous is None:
+                del micros[uid]
+            else:
+                micros[uid] = previous
 
     @staticmethod
     def find_next_number(data):
-        if not data:
+        current_numbers = set()
+        for value in data.values():
+            # multi-camera entries map camera ids to presets, skip the
+            # cameras without one like `MappingStore.targets_of`
+            values = value.values() if isinstance(value, dict) else [value]
+            current_numbers.update(int(v) for v in values if v)
+        if not current_numbers:
             return 10
-        current_numbers = {int(value) for value in data.values()}
 
         # Tìm số nhỏ nhất và lớn nhất trong tập hợp
         min_number = min(current_numbers)
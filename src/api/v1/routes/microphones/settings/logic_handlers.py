@@ -1,45 +1,14 @@
 from src.bases.api.routes import RouteLogicHandler
-from pathlib import Path
-import os
-import json
-from config import DECERNO_VHD_SETTING_PATH
+from src.common.config_store import settings_store
 
 
 class MicrophoneTrackingLogicHandler(RouteLogicHandler):
     def run(self, tracking_enabled: bool):
-        setting = self.read() or {}
-        setting['tracking_enabled'] = tracking_enabled
-        self.write(setting)
-
-        return setting
-
-    @staticmethod
-    def read():
-        if not os.path.exists(DECERNO_VHD_SETTING_PATH):
-            with open(DECERNO_VHD_SETTING_PATH, 'w') as f:
-                json.dump({}, f)
-        return json.load(open(DECERNO_VHD_SETTING_PATH, 'r'))
-
-    @staticmethod
-    def write(data):
-        with open(DECERNO_VHD_SETTING_PATH, 'w') as f:
-            json.dump(data, f)
+        return settings_store.set_tracking_enabled(tracking_enabled)
 
 
 class GetMicrophoneTrackingLogicHandler(RouteLogicHandler):
     def run(self):
-        return self.read() or {
+        return settings_store.copy() or {
             'tracking_enabled': False
         }
-
-    @staticmethod
-    def read():
-        if not os.path.exists(DECERNO_VHD_SETTING_PATH):
-            with open(DECERNO_VHD_SETTING_PATH, 'w') as f:
-                json.dump({}, f)
-        return json.load(open(DECERNO_VHD_SETTING_PATH, 'r'))
-
-    @staticmethod
-    def write(data):
-        with open(DECERNO_VHD_SETTING_PATH, 'w') as f:
-            json.dump(data, f)
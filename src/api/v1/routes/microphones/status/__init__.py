@@ -0,0 +1,10 @@
+from src.bases.api.routes import Route
+from .logic_handlers import MicrophoneStatusLogicHandler
+
+
+class MicrophoneStatusRoute(Route):
+    auth = False
+    path = "/microphones/status"
+    method = "get"
+
+    logic_handler_class = MicrophoneStatusLogicHandler
@@ -0,0 +1,24 @@
+from src.bases.api.routes import RouteLogicHandler
+from src.clients.dcerno import AsyncDcernoClient
+from config import DCERNO_CONFIG
+from src.bases.error.api import ServerError
+from src.bases.error.client import ClientError
+
+
+class MicrophoneStatusLogicHandler(RouteLogicHandler):
+    async def run(self, uids: str = None):
+        client = AsyncDcernoClient.shared(
+            host=DCERNO_CONFIG['host'],
+            port=DCERNO_CONFIG['port']
+        )
+        if uids:
+            uids = [uid.strip() for uid in uids.split(',') if uid.strip()]
+        else:
+            uids = None
+
+        try:
+            statuses = await client.get_microphone_statuses(uids, timeout=5)
+        except ClientError as e:
+            raise ServerError(message=e.message)
+
+        return dict(statuses=statuses)
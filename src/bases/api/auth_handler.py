@@ -3,6 +3,13 @@ from src.bases.error.service import ServiceError
 
 
 class AuthenticationHandler(object):
+    """Finds the `(access_token, accessor)` of a request.
+
+    `run` may be `async def`. A sync `run` is called in the threadpool by
+    async routes unless `blocking` is False, for handlers without I/O.
+    """
+    blocking = True
+
     def __init__(self, request, session):
         self.request = request
         self.session = session
@@ -13,6 +20,9 @@ class AuthenticationHandler(object):
 
 
 class BaseAuthenticationHandler(AuthenticationHandler):
+    # set back to True when the token is checked with the IAM service
+    blocking = False
+
     def run(self):
         # auth_data = self.request.headers.get('Authorization', None)
         # if not auth_data:
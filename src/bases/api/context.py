@@ -0,0 +1,54 @@
+import logging
+
+
+class ApiContext(object):
+    """Clients shared by every request of an API app.
+
+    Opened once by the app lifespan and handed to each `RouteLogicHandler`.
+    The Redis connection pool and the `MongoClient`, with its monitor
+    threads, live as long as the app instead of one request. Async
+    handlers use `async_redis`, which has its own pool on the event loop.
+    """
+
+    def __init__(self,
+                 redis_config: dict = None,
+                 mongo_config: dict = None,
+                 logger: logging.Logger = None):
+        self.redis_config = redis_config
+        self.mongo_config = mongo_config
+        self.logger = logger
+
+        self.redis = None
+        self.async_redis = None
+        self.mongo = None
+        self.mongodb = None
+
+    def open(self):
+        # client libraries are only imported when configured
+        if self.redis_config and self.redis is None:
+            from src.databases import Redis, AsyncRedis
+
+            # connections are made on first use and pooled
+            self.redis = Redis(**self.redis_config)
+            self.async_redis = AsyncRedis(**self.redis_config)
+        if self.mongo_config and self.mongo is None:
+            from src.databases import Mongo
+
+            self.mongo = Mongo(self.mongo_config)
+            self.mongodb = self.mongo.get_database()
+        return self
+
+    def close(self):
+        if self.redis is not None:
+            self.redis.close()
+            self.redis = None
+        if self.mongo is not None:
+            self.mongo.close()
+            self.mongo = None
+            self.mongodb = None
+
+    async def aclose(self):
+        if self.async_redis is not None:
+            await self.async_redis.aclose()
+            self.async_redis = None
+        self.close()
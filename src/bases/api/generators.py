@@ -1,37 +1,47 @@
 import os
-import sys
-import importlib
 import inspect
 import logging
-import tracemalloc
-import sentry_sdk
 import json
 from fastapi import FastAPI, status, Request
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.encoders import jsonable_encoder
 from pydantic_core import PydanticUndefinedType
-from sqlalchemy.orm import sessionmaker
-from fastapi_profiler import PyInstrumentProfilerMiddleware
 from contextlib import asynccontextmanager
-
-from src.bases.api.routes import Route
+from typing import TYPE_CHECKING
+
+from src.bases.api.context import ApiContext
+from src.bases.api.manifest import (MANIFEST_VERSION,
+                                    discover_route_classes,
+                                    load_route_classes,
+                                    manifest_entry,
+                                    read_manifest,
+                                    write_manifest)
 from src.bases.api.middlewares import CorsMiddleware
-from src.bases.api.logging_handlers import LoggingJsonFormatter
+from src.common.logging_handlers import (LoggingJsonFormatter,
+                                         setup_queue_logging)
 from src.common.constants import TMP_DIR
+from src.common import metrics
 from config import ENVIRONMENT
 
+if TYPE_CHECKING:
+    from sqlalchemy.orm import sessionmaker
+
 
 class ApiGenerator(object):
     def __init__(
             self,
             router_modules: list,
-            sql_session_maker: sessionmaker = None,
+            sql_session_maker: 'sessionmaker' = None,
             mongo_config: dict = None,
             redis_config: dict = None,
             middlewares: list = None,
             sentry_dns: str = None,
             logger: logging.RootLogger = None,
+            log_level: int | str = logging.DEBUG,
+            route_manifest: str = None,
+            strict_routes: bool = True,
+            on_shutdown: list = None,
     ):
         self.router_modules = router_modules
         self.redis_config = redis_config
@@ -39,7 +49,58 @@ class ApiGenerator(object):
         self.sql_session_maker = sql_session_maker
         self.middlewares = middlewares or []
         self.logger = logger
+        self.log_level = log_level
+        self.route_manifest = route_manifest
+        self.strict_routes = strict_routes
+        # callables, sync or async, run when the lifespan ends
+        self.on_shutdown = on_shutdown or []
+        self._manifest = None
         self.sentry_dns = sentry_dns
+        self.context = ApiContext(
+            redis_config=redis_config,
+            mongo_config=mongo_config,
+            logger=logger,
+        )
+
+    def _load_manifest(self):
+        if self._manifest is None:
+            self._manifest = (
+                read_manifest(self.route_manifest) or dict(
+                    version=MANIFEST_VERSION, routers=dict()
+                )
+            )
+        return self._manifest
+
+    def _route_classes(self, router_module):
+        """Route classes of a router module, from the manifest if any.
+
+        A router missing from the manifest is discovered and added to it,
+        so a manifest under `TMP_DIR` acts as a cache.
+        """
+        name = router_module.__name__
+        if not self.route_manifest:
+            return discover_route_classes(router_module, self.strict_routes)
+
+        manifest = self._load_manifest()
+        entries = manifest['routers'].get(name)
+        if entries is not None:
+            return load_route_classes(entries, self.strict_routes)
+
+        route_classes = discover_route_classes(
+            router_module, self.strict_routes
+        )
+        manifest['routers'][name] = [
+            manifest_entry(rc) for rc in route_classes
+        ]
+        try:
+            write_manifest(self.route_manifest, manifest)
+        except OSError as e:
+            if self.logger:
+                self.logger.warning(
+                    'Cannot write route manifest %s: %s',
+                    self.route_manifest, e
+                )
+        return route_classes
 
     def _add_routers(self, app: FastAPI):
         for router_module in self.router_modules:
@@ -47,43 +108,11 @@ class ApiGenerator(object):
             if not router:
                 continue
 
-            root_path = router_module.__name__.split('.')
-            root_dir = os.path.dirname(router_module.__file__)
-            if sys.platform in ['linux', 'darwin']:
-                dir_separator = '/'
-            else:
-                dir_separator = '\\'
-
-            route_classes = []
-
-            for dir_path, dir_names, file_names in os.walk(root_dir):
-                diff = os.path.relpath(dir_path, root_dir)
-                if diff == '.':
-                    diff_dirs = []
-                else:
-                    diff_dirs = diff.split(dir_separator)
-                target_pack_prefix = root_path + diff_dirs
-                for dir_name in dir_names:
-                    try:
-                        target_pack = target_pack_prefix + [dir_name]
-                        module = importlib.import_module('.'.join(target_pack))
-                        classes = inspect.getmembers(module,
-                                                     inspect.isclass)
-                        for cls_name, cls in classes:
-                            if not issubclass(cls, Route):
-                                continue
-
-                            if cls is Route:
-                                continue
-
-                            route_classes.append(cls)
-                    except:
-                        pass
+            route_classes = self._route_classes(router_module)
 
             for rc in route_classes:
                 route = rc(
-                    redis_config=self.redis_config,
-                    mongo_config=self.mongo_config,
+                    context=self.context,
                     sql_session_maker=self.sql_session_maker,
                     logger=self.logger
                 )
@@ -97,6 +126,22 @@ class ApiGenerator(object):
 
         return app
 
+    def _add_metrics(self, app: FastAPI):
+        def render_metrics():
+            return Response(
+                content=metrics.render(),
+                media_type=metrics.CONTENT_TYPE,
+            )
+
+        app.add_api_route(
+            path='/metrics',
+            endpoint=render_metrics,
+            methods=['get'],
+            include_in_schema=False,
+        )
+
+        return app
+
     def _add_middlewares(self, app: FastAPI):
         for md in self.middlewares:
             app.add_middleware(md)
@@ -137,10 +182,12 @@ class ApiGenerator(object):
             )
 
     def _config_logger(self, app):
-        handler = logging.StreamHandler()
-        handler.setFormatter(LoggingJsonFormatter())
-        self.logger.handlers = [handler]
-        self.logger.setLevel(logging.DEBUG)
+        # records are formatted and written off the request path
+        setup_queue_logging(
+            self.logger,
+            formatter=LoggingJsonFormatter(),
+            level=self.log_level,
+        )
         logging.getLogger('uvicorn.access').disabled = True
 
         setattr(app, 'logger', self.logger)
@@ -148,6 +195,9 @@ class ApiGenerator(object):
         return app
 
     def _add_profiler(self, app):
+        # pyinstrument is only loaded when profiling
+        from fastapi_profiler import PyInstrumentProfilerMiddleware
+
         app.add_middleware(
             PyInstrumentProfilerMiddleware,
             server_app=app,
@@ -162,9 +212,20 @@ class ApiGenerator(object):
         @asynccontextmanager
         async def lifespan(app: FastAPI):
             if with_tracemalloc:
+                import tracemalloc
                 tracemalloc.start()
 
-            yield
+            # clients shared by all requests, see `ApiContext`
+            app.state.context = self.context.open()
+
+            try:
+                yield
+            finally:
+                for callback in self.on_shutdown:
+                    result = callback()
+                    if inspect.isawaitable(result):
+                        await result
+                await self.context.aclose()
 
             if with_tracemalloc:
                 snapshot = tracemalloc.take_snapshot()
@@ -179,6 +240,8 @@ class ApiGenerator(object):
         return lifespan
 
     def _config_sentry(self):
+        import sentry_sdk
+
         sentry_sdk.init(
             dsn=self.sentry_dns,
             # Set traces_sample_rate to 1.0 to capture 100%
@@ -193,7 +256,8 @@ class ApiGenerator(object):
     def run(self,
             title: str,
             with_profiler: bool = False,
-            with_tracemalloc: bool = False
+            with_tracemalloc: bool = False,
+            with_metrics: bool = True
             ) -> FastAPI:
 
         if self.sentry_dns:
@@ -216,6 +280,9 @@ class ApiGenerator(object):
         self._config_cors(app)
         self._config_exception_handlers(app)
 
+        if with_metrics:
+            self._add_metrics(app)
+
         self._add_routers(app)
 
         return app
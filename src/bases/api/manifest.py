@@ -0,0 +1,152 @@
+"""Route manifest: the `Route` classes of each router module, prebuilt.
+
+Discovery imports every package under a router module to find its routes;
+with a manifest `ApiGenerator` imports only the modules that define
+routes, in the recorded order, without walking the filesystem.
+
+    poetry run python -m src.bases.api.manifest src.api.v1 \\
+        --output src/api/route_manifest.json
+    poetry run python -m src.bases.api.manifest src.api.v1 \\
+        --output src/api/route_manifest.json --check
+
+An entry is `"<module>:<class>"`; routes are ordered static paths first,
+then by module and definition order, so the same tree always gives the
+same app.
+"""
+import os
+import json
+import logging
+import pkgutil
+import importlib
+
+import click
+
+from src.bases.api.routes import Route
+
+log = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def _route_sort_key(route_class):
+    # static paths first so `/microphones/ping` is not captured by
+    # `/microphones/{uid}`
+    return '{' in (route_class.path or '')
+
+
+def manifest_entry(route_class):
+    return f'{route_class.__module__}:{route_class.__qualname__}'
+
+
+def module_route_classes(module):
+    """`Route` subclasses defined in `module`, in definition order."""
+    return [
+        value for value in vars(module).values()
+        if isinstance(value, type) and issubclass(value, Route)
+        and value is not Route and value.__module__ == module.__name__
+    ]
+
+
+def _import_packages(package, onerror):
+    """Imports the packages under `package`, depth first, sorted by name."""
+    for module_info in pkgutil.iter_modules(
+            package.__path__, prefix=package.__name__ + '.'
+    ):
+        if not module_info.ispkg:
+            continue
+        try:
+            module = importlib.import_module(module_info.name)
+        except Exception:
+            onerror(module_info.name)
+            continue
+        yield module
+        yield from _import_packages(module, onerror)
+
+
+def discover_route_classes(router_module, strict=True):
+    """Imports the packages under `router_module` and collects routes.
+
+    With `strict` an import error is raised, otherwise it is logged and
+    the package skipped.
+    """
+    def onerror(name):
+        if strict:
+            raise
+        log.exception('Skipping routes of %s', name)
+
+    route_classes = []
+    for module in _import_packages(router_module, onerror):
+        route_classes.extend(module_route_classes(module))
+
+    route_classes.sort(key=_route_sort_key)
+    return route_classes
+
+
+def load_route_classes(entries, strict=True):
+    """Imports the `"<module>:<class>"` entries of a manifest."""
+    route_classes = []
+    for entry in entries:
+        module_name, class_name = entry.split(':')
+        try:
+            module = importlib.import_module(module_name)
+            route_classes.append(getattr(module, class_name))
+        except Exception:
+            if strict:
+                raise
+            log.exception('Skipping route %s', entry)
+    return route_classes
+
+
+def build_manifest(router_modules, strict=True):
+    routers = dict()
+    for router_module in router_modules:
+        routers[router_module.__name__] = [
+            manifest_entry(rc)
+            for rc in discover_route_classes(router_module, strict=strict)
+        ]
+    return dict(version=MANIFEST_VERSION, routers=routers)
+
+
+def read_manifest(path):
+    """Returns the manifest at `path`, None when missing or outdated."""
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(path, manifest):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+        f.write('\n')
+    os.replace(temp_path, path)
+
+
+@click.command()
+@click.argument('router_modules', nargs=-1, required=True)
+@click.option('--output', required=True, type=click.Path(dir_okay=False))
+@click.option('--check', is_flag=True,
+              help='Fail if the manifest differs instead of writing it.')
+def main(router_modules, output, check):
+    manifest = build_manifest([
+        importlib.import_module(name) for name in router_modules
+    ])
+    if check:
+        if read_manifest(output) != manifest:
+            raise click.ClickException(f'{output} is outdated')
+        return
+    write_manifest(output, manifest)
+    count = sum(len(entries) for entries in manifest['routers'].values())
+    click.echo(f'{count} routes written to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,8 @@
 import time
-from datetime import datetime
+import logging
+import itertools
+from uuid import uuid4
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
 
 
 class CorsMiddleware(CORSMiddleware):
@@ -19,32 +20,88 @@ class CorsMiddleware(CORSMiddleware):
         return origin in self.allow_origins
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        start_time = time.time()
-        logging_message = '{method} - {host}:{port}'.format(
-            host=request.client.host,
-            port=request.client.port,
-            method=request.method.upper()
-        )
-        logging_data = dict(
-            timestamp=datetime.utcnow().isoformat(),
-            method=request.method.upper(),
-            url=str(request.url),
-        )
+class AccessLogMiddleware(object):
+    """Logs one record per HTTP request, as a plain ASGI middleware.
+
+    Status and body size are read from the `send` channel, so streaming
+    responses pass through untouched. The request id is taken from
+    `X-Request-ID` or generated, and echoed in the response; the trace id
+    comes from a W3C `traceparent` header, if any.
+
+    Records go to `logger`, by default `api.access`, and are only built
+    when INFO is enabled for it. `api.access` has no handler of its own:
+    its records propagate to the root logger, which `ApiGenerator` sends
+    through its queue when the app's logger is the root logger.
+    """
+    REQUEST_ID_HEADER = b'x-request-id'
 
-        response = await call_next(request)
+    def __init__(self, app, logger: logging.Logger = None):
+        self.app = app
+        self.logger = logger or logging.getLogger('api.access')
+        # unique within the process, much cheaper than a uuid per request
+        self._prefix = uuid4().hex[:8]
+        self._counter = itertools.count(1)
 
-        logging_data['status_code'] = response.status_code
-        logging_data['res_time'] = round(time.time() - start_time, 4)
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.logger.isEnabledFor(
+                logging.INFO):
+            await self.app(scope, receive, send)
+            return
 
-        if request.app.logger:
-            request.app.logger.info(
-                logging_message,
-                extra=dict(
-                    data=logging_data
-                )
-            )
+        started = time.perf_counter_ns()
+        request_id = None
+        trace_id = None
+        for name, value in scope['headers']:
+            if name == self.REQUEST_ID_HEADER:
+                request_id = value
+            elif name == b'traceparent':
+                # version-traceid-parentid-flags
+                trace_id = value[3:35].decode('latin-1')
+        if request_id is None:
+            request_id = f'{self._prefix}-{next(self._counter)}'.encode()
 
-        return response
+        status_code = 500
+        size = 0
 
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                message['headers'] = list(message.get('headers', ())) + [
+                    (self.REQUEST_ID_HEADER, request_id)
+                ]
+            elif message['type'] == 'http.response.body':
+                size += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._log(scope, started, status_code, size, request_id, trace_id)
+
+    def _log(self, scope, started, status_code, size, request_id, trace_id):
+        client = scope.get('client') or (None, None)
+        method = scope['method']
+        # `makeRecord` and `handle` skip the stack walk of `findCaller`,
+        # the caller is always this method
+        record = self.logger.makeRecord(
+            self.logger.name,
+            logging.INFO,
+            __file__,
+            0,
+            '%s %s %s',
+            (method, scope['path'], status_code),
+            None,
+            extra=dict(data=dict(
+                method=method,
+                path=scope['path'],
+                query=scope.get('query_string', b'').decode('latin-1'),
+                status_code=status_code,
+                bytes=size,
+                res_time=(time.perf_counter_ns() - started) / 1e9,
+                client=f'{client[0]}:{client[1]}',
+                request_id=request_id.decode('latin-1'),
+                trace_id=trace_id,
+            )),
+        )
+        self.logger.handle(record)
@@ -1,30 +1,57 @@
+import time
 import inspect
+from anyio import from_thread
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 
-from src.databases import Redis, Mongo
 from src.bases.api.auth_handler import BaseAuthenticationHandler
+from src.bases.api.context import ApiContext
 from src.bases.error.api import HTTPError
+from src.common.metrics import Histogram
 
 from config import ENVIRONMENT
 
+REQUEST_SECONDS = Histogram(
+    'api_request_seconds',
+    'API request latency, by route path template.',
+    ('method', 'path', 'status'),
+)
+
+
+def close_session(session):
+    if session is not None:
+        session.close()
+
+
+async def aclose_session(session):
+    """Closes a SQL session without blocking the event loop."""
+    if session is None:
+        return
+    if inspect.iscoroutinefunction(session.close):
+        await session.close()
+    else:
+        # may roll back over the network
+        await run_in_threadpool(session.close)
+
 
 class RouteLogicHandler(object):
     def __init__(self,
                  request,
                  session,
-                 redis,
-                 mongo=None,
+                 context: ApiContext = None,
                  accessor=None,
                  accesses=None,
                  access_token=None,
                  logger=None
                  ):
         self.request = request
-        self.redis = redis
+        self.context = context or ApiContext()
+        # shared clients, never closed by a handler
+        self.redis = self.context.redis
+        self.async_redis = self.context.async_redis
+        self.mongodb = self.context.mongodb
         self.session = session
-        if mongo:
-            self.mongodb = mongo.get_database()
         self.accessor = accessor
         self.accesses = accesses
         self.access_token = access_token
@@ -33,6 +60,14 @@ class RouteLogicHandler(object):
     def run(self, **kwargs):
         raise NotImplementedError
 
+    def close(self):
+        """Releases per-request resources, the `context` clients stay."""
+        close_session(self.session)
+
+    async def aclose(self):
+        """`close` for async handlers, awaited by `Route.handle_async`."""
+        await aclose_session(self.session)
+
 
 class MetaRoute(type):
     def __new__(cls, class_name, bases, attrs):
@@ -49,15 +84,20 @@ class MetaRoute(type):
                 f'{logic_handler_class} is not a valid RouteLogicHandler type'
             )
 
-        handle_func = attrs.get('handle')
+        logic_handler = logic_handler_class.run
+
+        # `async def run` logic handlers get an async endpoint, served on
+        # the event loop instead of the threadpool
+        is_async = inspect.iscoroutinefunction(logic_handler)
+        handle_name = 'handle_async' if is_async else 'handle'
+
+        handle_func = attrs.get(handle_name)
         if not handle_func:
-            handle_func = cls.get_handle_function(bases)
+            handle_func = cls.get_handle_function(bases, handle_name)
 
         if not handle_func:
             return super().__new__(cls, class_name, bases, attrs)
 
-        logic_handler = logic_handler_class.run
-
         parameters = dict()
 
         for param_name, param in inspect.signature(
@@ -74,8 +114,12 @@ class MetaRoute(type):
             raise TypeError('Missing request param in handle function')
         parameters['request'] = request_param
 
-        def run(self, **kwargs):
-            return handle_func(self, **kwargs)
+        if is_async:
+            async def run(self, **kwargs):
+                return await handle_func(self, **kwargs)
+        else:
+            def run(self, **kwargs):
+                return handle_func(self, **kwargs)
 
         setattr(
             run,
@@ -87,11 +131,11 @@ class MetaRoute(type):
         return super().__new__(cls, class_name, bases, attrs)
 
     @staticmethod
-    def get_handle_function(bases: tuple):
+    def get_handle_function(bases: tuple, name: str = 'handle'):
         result = None
 
         for base in reversed(bases):
-            result = getattr(base, 'handle', None)
+            result = getattr(base, name, None)
             if result is not None:
                 break
 
@@ -109,31 +153,64 @@ class Route(metaclass=MetaRoute):
 
     def __init__(self,
                  sql_session_maker=None,
-                 redis_config=None,
-                 mongo_config=None,
+                 context: ApiContext = None,
                  logger=None
                  ):
         self.sql_session_maker = sql_session_maker
-        self.redis_config = redis_config
-        self.mongo_config = mongo_config
+        self.context = context
         self.logger = logger
 
-    def handle(self, *, request: Request, **kwargs):
-        session = None
-        redis = None
-        mongo = None
-
+    def _open_session(self):
         if self.sql_session_maker:
-            session = self.sql_session_maker()
-        if self.redis_config:
-            redis = Redis(**self.redis_config)
-        if self.mongo_config:
-            mongo = Mongo(self.mongo_config)
-        auth_handler = BaseAuthenticationHandler(
+            return self.sql_session_maker()
+        return None
+
+    def _authenticate(self, request: Request, session):
+        auth_handler = self.auth_handler_class(
+            session=session,
+            request=request
+        )
+        if inspect.iscoroutinefunction(auth_handler.run):
+            # sync endpoints run in an anyio worker thread
+            return from_thread.run(auth_handler.run)
+        return auth_handler.run()
+
+    async def _authenticate_async(self, request: Request, session):
+        auth_handler = self.auth_handler_class(
             session=session,
             request=request
         )
-        access_token, accessor = auth_handler.run()
+        if inspect.iscoroutinefunction(auth_handler.run):
+            return await auth_handler.run()
+        if auth_handler.blocking:
+            return await run_in_threadpool(auth_handler.run)
+        return auth_handler.run()
+
+    def _create_logic_handler(self, request: Request):
+        session = self._open_session()
+        try:
+            access_token, accessor = self._authenticate(request, session)
+            return self._build_logic_handler(
+                request, session, access_token, accessor
+            )
+        except BaseException:
+            close_session(session)
+            raise
+
+    async def _create_logic_handler_async(self, request: Request):
+        session = self._open_session()
+        try:
+            access_token, accessor = await self._authenticate_async(
+                request, session
+            )
+            return self._build_logic_handler(
+                request, session, access_token, accessor
+            )
+        except BaseException:
+            await aclose_session(session)
+            raise
+
+    def _build_logic_handler(self, request, session, access_token, accessor):
         accesses = dict()
 
         if self.auth and not access_token:
@@ -142,10 +219,9 @@ class Route(metaclass=MetaRoute):
         if self.auth and self.actions:
             self._validate_access()
 
-        lh = self.logic_handler_class(
+        return self.logic_handler_class(
             session=session,
-            mongo=mongo,
-            redis=redis,
+            context=self.context,
             request=request,
             accesses=accesses,
             accessor=accessor,
@@ -153,20 +229,8 @@ class Route(metaclass=MetaRoute):
             logger=self.logger
         )
 
-        error = None
-        response = None
-
-        try:
-            response = lh.run(**kwargs)
-        except Exception as e:
-            error = e
-
-        if session:
-            session.close()
-
-        if redis:
-            redis.close()
-
+    @staticmethod
+    def _make_response(response, error):
         if error is not None:
             if isinstance(error, HTTPError):
                 return JSONResponse(
@@ -181,6 +245,61 @@ class Route(metaclass=MetaRoute):
 
         return response
 
+    def _observe(self, started, status_code):
+        REQUEST_SECONDS.labels(
+            self.method.upper(), self.path, str(status_code)
+        ).observe(time.perf_counter() - started)
+
+    def handle(self, *, request: Request, **kwargs):
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            lh = self._create_logic_handler(request)
+
+            error = None
+            response = None
+
+            try:
+                response = lh.run(**kwargs)
+            except Exception as e:
+                error = e
+            finally:
+                lh.close()
+
+            response = self._make_response(response, error)
+            status_code = getattr(response, 'status_code', 200)
+            return response
+        except HTTPException as e:
+            status_code = e.status_code
+            raise
+        finally:
+            self._observe(started, status_code)
+
+    async def handle_async(self, *, request: Request, **kwargs):
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            lh = await self._create_logic_handler_async(request)
+
+            error = None
+            response = None
+
+            try:
+                response = await lh.run(**kwargs)
+            except Exception as e:
+                error = e
+            finally:
+                await lh.aclose()
+
+            response = self._make_response(response, error)
+            status_code = getattr(response, 'status_code', 200)
+            return response
+        except HTTPException as e:
+            status_code = e.status_code
+            raise
+        finally:
+            self._observe(started, status_code)
+
     def _validate_access(self):
         pass
 
@@ -1,5 +1,3 @@
-from eventlet.greenpool import GreenPool
-
 from src.common.dict_utils import flatten_dict
 
 
@@ -52,6 +50,9 @@ class Crawler(Core):
         self.bulk_size = bulk_size
         self.max_workers = max_workers
 
+        # eventlet is only needed by crawlers
+        from eventlet.greenpool import GreenPool
+
         self.worker_pool = GreenPool(self.max_workers)
 
     @staticmethod
@@ -128,6 +129,8 @@ class Crawler(Core):
                 }
             mapped_ops[coll_name]['ops'].append(op['operation'])
 
+        from eventlet.greenpool import GreenPool
+
         worker_pool = GreenPool(self.max_workers)
 
         for coll_name, coll_data in mapped_ops.items():
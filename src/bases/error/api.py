@@ -30,6 +30,11 @@ class PermissionError(HTTPError):
     message = 'Permission error.'
 
 
+class NotFound(HTTPError):
+    status_code = 404
+    message = 'Not found.'
+
+
 class ServiceNotAvailable(HTTPError):
     status_code = 503
     message = 'Service not available.'
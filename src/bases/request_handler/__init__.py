@@ -1,18 +1,22 @@
 import logging
 import time
 import json
-import requests
 from functools import wraps
-from requests.exceptions import ConnectionError, ConnectTimeout
+from typing import TYPE_CHECKING
 
 from src.common.json_encoders import CustomJsonEncoder
-from src.common.utils import log_data, get_now
+from src.common.utils import log_data, get_now, log
+
+if TYPE_CHECKING:
+    import requests
 
 
 def request_connection_handler(max_retry=2):
     def decorator(func):
         @wraps(func)
         def handle(*args, **kwargs):
+            from requests.exceptions import ConnectionError, ConnectTimeout
+
             retry_count = 0
             error = None
             # retry if connection error happens
@@ -39,16 +43,54 @@ def request_connection_handler(max_retry=2):
     return decorator
 
 
+# (connect, read) in seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+
+SUPPORTED_METHODS = ('get', 'post', 'put', 'patch', 'delete', 'head', 'options')
+
+
+def make_session(pool_maxsize: int = 4,
+                 pool_connections: int = 4) -> 'requests.Session':
+    """A keep-alive session with `pool_maxsize` connections per host.
+
+    Retries are left to `request_connection_handler`. `requests` is
+    imported here, so importing a client does not load it.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=0,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
 class RequestHandler(object):
     trace_id = None
+    timeout = DEFAULT_TIMEOUT
 
-    def __init__(self, logger: logging.Logger = None):
+    def __init__(self,
+                 logger: logging.Logger = None,
+                 session: 'requests.Session' = None,
+                 timeout=None):
         self.logger = logger
+        self.session = session or make_session()
+        if timeout is not None:
+            self.timeout = timeout
+
+    def close(self):
+        self.session.close()
 
-    def _do_request(self, method, url, timeout=10000, **kwargs):
-        method_handler = getattr(requests, method, None)
-        if not method_handler:
+    def _do_request(self, method, url, timeout=None, **kwargs):
+        if method not in SUPPORTED_METHODS:
             raise Exception('UnsupportedMethod')
+        if timeout is None:
+            timeout = self.timeout
 
         # handle with ObjectId and Datetime
         json_param = kwargs.get('json')
@@ -60,34 +102,33 @@ class RequestHandler(object):
                 )
             )
 
-        log_data(
-            mode='info',
-            logger=self.logger,
-            kwargs=dict(
-                asctime=get_now().isoformat(),
-                trace_id=self.trace_id,
-                client=self.__class__.__name__,
-                method=method,
-                url=url,
-                payload=kwargs
-            )
-        )
-        response = method_handler(url=url,
-                                  timeout=timeout,
-                                  **kwargs)
-        log_data(
-            mode='info',
-            logger=self.logger,
-            kwargs=dict(
-                asctime=get_now().isoformat(),
-                trace_id=self.trace_id,
-                client=self.__class__.__name__,
-                method=method,
-                url=url,
-                response=response.text
-            )
-        )
+        started = time.perf_counter()
+        response = self.session.request(method=method,
+                                        url=url,
+                                        timeout=timeout,
+                                        **kwargs)
+        self._log_request(method, url, kwargs, response, started)
         return response
 
+    def _log_request(self, method, url, kwargs, response, started):
+        """Logs a request once, with its payloads only at DEBUG."""
+        logger = self.logger or log
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        data = dict(
+            asctime=get_now().isoformat(),
+            trace_id=self.trace_id,
+            client=self.__class__.__name__,
+            method=method,
+            url=url,
+            status_code=response.status_code,
+            res_time=round(time.perf_counter() - started, 4),
+        )
+        mode = 'info'
+        if logger.isEnabledFor(logging.DEBUG):
+            mode = 'debug'
+            data.update(payload=kwargs, response=response.text)
+        log_data(mode=mode, logger=logger, kwargs=data)
+
     def set_trace_id(self, value: str):
         self.trace_id = value
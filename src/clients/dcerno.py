@@ -1,32 +1,381 @@
+import time
 import socket
 import json
-import re
+import queue
+import asyncio
+import logging
 import datetime
-from cachetools import cached, LRUCache
-from threading import Lock
+import itertools
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from threading import Lock, Thread
 from src.bases.error.client import ClientError
+from src.common.backoff import Backoff
+from src.common.metrics import Counter, Histogram
 
+log = logging.getLogger(__name__)
 
-class SingletonSocket:
-    """A thread-safe Singleton implementation for managing a single socket connection."""
-    _instance = None
-    _lock = Lock()
+STX = 0x02  # Start of text character
+ETX = 0x03  # End of text character
 
-    def __new__(cls, *args, **kwargs):
-        with cls._lock:
-            if not cls._instance:
-                cls._instance = super(SingletonSocket, cls).__new__(cls)
-                cls._instance._initialized = False
-        return cls._instance
+# `02:` + type(3) + id(4) + format(2) + qos(1) + tx(1+5) + rx(1+5)
+# + prop(1) + session(1) + room(3), see `mapping_payload`
+HEADER_LENGTH = 30
+# header + 4 digits length + ':'
+BODY_OFFSET = HEADER_LENGTH + 5
+
+REPLY_PACKET_TYPE = 'rep'
+
+# sent when the link has been silent for a heartbeat interval
+HEARTBEAT_BODY = {"nam": "gmicstat", "uid": "0"}
+
+REQUEST_SECONDS = Histogram(
+    'dcerno_request_seconds',
+    'Round trip of a D-Cerno request until its reply.',
+    ('name',),
+)
+FRAME_DECODE_SECONDS = Histogram(
+    'dcerno_frame_decode_seconds',
+    'Time to decode the frames of one socket read.',
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+             0.001, 0.0025, 0.005, 0.01),
+)
+FRAMES = Counter(
+    'dcerno_frames_total', 'Frames received, by packet type.', ('type',)
+)
+FRAMES_DROPPED = Counter(
+    'dcerno_frames_dropped_total', 'Malformed or truncated frames dropped.'
+)
+LINK_TRANSITIONS = Counter(
+    'dcerno_link_transitions_total',
+    'Link state changes; `state="ready"` counts (re)connects.',
+    ('state',),
+)
+
+
+def map_microphone_statuses(body):
+    """Maps a `gmicstat` reply body to `{uid: status}`.
+
+    A reply for `uid='0'` lists every microphone under `s`, a reply for a
+    single serial is the status itself; either way a status has the shape
+    of an `s` entry, without the reply's `nam`.
+    """
+    if not isinstance(body, dict):
+        return dict()
+    if isinstance(body.get('s'), list):
+        return {
+            status['uid']: status
+            for status in body['s']
+            if status.get('uid') is not None
+        }
+    if body.get('uid') is not None:
+        return {body['uid']: {k: v for k, v in body.items() if k != 'nam'}}
+    return dict()
+
+
+class Frame(object):
+    """A decoded TCCP frame: header fields plus the parsed JSON body."""
+    __slots__ = (
+        'protocol_id',
+        'packet_type',
+        'packet_id',
+        'body_format_type',
+        'qos',
+        'tx_type',
+        'tx_id',
+        'rx_type',
+        'rx_id',
+        'tx_prop',
+        'tx_session',
+        'room_id',
+        'length',
+        'body',
+    )
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            setattr(self, name, kwargs.get(name))
+
+    @property
+    def nam(self):
+        if isinstance(self.body, dict):
+            return self.body.get('nam')
+        return None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return (f'Frame({self.packet_type}{self.packet_id} '
+                f'nam={self.nam!r})')
+
+
+class FrameDecoder(object):
+    """Incremental STX/ETX TCCP frame decoder.
+
+    Bytes are appended to one reusable buffer; `feed` returns the frames
+    completed by the new data. The scan position is kept between calls so
+    a partial frame is never searched twice. Frames with a wrong length
+    field or an undecodable body are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, validate_length=True, max_frame_size=65536):
+        self.validate_length = validate_length
+        self.max_frame_size = max_frame_size
+        self.dropped = 0
+
+        self._buffer = bytearray()
+        # index of the STX of the frame being assembled, -1 when none
+        self._start = -1
+        # index from which to continue searching
+        self._scan = 0
+
+    def reset(self):
+        self._buffer.clear()
+        self._start = -1
+        self._scan = 0
+
+    def feed(self, data):
+        buffer = self._buffer
+        buffer += data
+        frames = []
+
+        while True:
+            if self._start < 0:
+                start = buffer.find(STX, self._scan)
+                if start < 0:
+                    # only garbage between frames, nothing to keep
+                    self._scan = len(buffer)
+                    break
+                self._start = start
+                self._scan = start + 1
+
+            end = buffer.find(ETX, self._scan)
+            if end < 0:
+                # a new STX before ETX means the previous frame was truncated
+                restart = buffer.rfind(STX, self._scan)
+                if restart >= 0:
+                    self.dropped += 1
+                    self._start = restart
+                if len(buffer) - self._start > self.max_frame_size:
+                    self.dropped += 1
+                    self._start = -1
+                self._scan = len(buffer)
+                break
+
+            restart = buffer.rfind(STX, self._scan, end)
+            if restart >= 0:
+                self.dropped += 1
+                self._start = restart
+
+            frame = self._parse(buffer, self._start + 1, end)
+            if frame is None:
+                self.dropped += 1
+            else:
+                frames.append(frame)
+            self._start = -1
+            self._scan = end + 1
+
+        consumed = self._start if self._start >= 0 else self._scan
+        if consumed:
+            del buffer[:consumed]
+            self._scan -= consumed
+            if self._start >= 0:
+                self._start = 0
+
+        return frames
+
+    def _parse(self, buffer, begin, end):
+        if end - begin < BODY_OFFSET:
+            return None
+        try:
+            header = buffer[begin:begin + BODY_OFFSET].decode('ascii')
+            body = buffer[begin + BODY_OFFSET:end].decode('utf-8')
+            length = int(header[30:34])
+        except ValueError:
+            return None
+
+        if header[2] != ':' or header[34] != ':':
+            return None
+        if self.validate_length and length != HEADER_LENGTH + len(body) + 2:
+            return None
+
+        if body.startswith('{'):
+            try:
+                body = json.loads(body)
+            except ValueError:
+                return None
+
+        return Frame(
+            protocol_id=header[0:2],
+            packet_type=header[3:6],
+            packet_id=header[6:10],
+            body_format_type=header[10:12],
+            qos=header[12],
+            tx_type=header[13],
+            tx_id=header[14:19],
+            rx_type=header[19],
+            rx_id=header[20:25],
+            tx_prop=header[25],
+            tx_session=header[26],
+            room_id=header[27:30],
+            length=length,
+            body=body,
+        )
+
+
+def decode_frames(decoder, data):
+    """Feeds `decoder`, timing the decode and counting dropped frames."""
+    dropped = decoder.dropped
+    started = time.perf_counter()
+    frames = decoder.feed(data)
+    FRAME_DECODE_SECONDS.observe(time.perf_counter() - started)
+    if decoder.dropped != dropped:
+        FRAMES_DROPPED.inc(decoder.dropped - dropped)
+    return frames
+
+
+def request_name(packet_type, body):
+    if isinstance(body, dict):
+        return body.get('nam', packet_type)
+    return packet_type
+
+
+def enable_keepalive(sock, idle=5, interval=2, count=3):
+    """Lets the kernel detect a dead peer within about
+    `idle + interval * count` seconds of silence."""
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    for option, value in (('TCP_KEEPIDLE', idle),
+                          ('TCP_KEEPINTVL', interval),
+                          ('TCP_KEEPCNT', count)):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+class LinkState(object):
+    """States of the link to a central unit."""
+    CLOSED = 'closed'
+    CONNECTING = 'connecting'
+    HANDSHAKING = 'handshaking'
+    READY = 'ready'
+    # connected, but a reply or heartbeat is overdue
+    DEGRADED = 'degraded'
+    # waiting before the next connection attempt
+    BACKOFF = 'backoff'
+
+    CONNECTED = (READY, DEGRADED)
+
+
+class LinkStatus(object):
+    """Observable state of a connection, shared by both clients.
+
+    Listeners are called as `listener(state, error)` on every change.
+    """
+
+    def __init__(self):
+        self.state = LinkState.CLOSED
+        self.since = time.monotonic()
+        self.last_frame_at = None
+        self.last_error = None
+        self.connects = 0
+        self.failures = 0
+        self.listeners = []
+
+    @property
+    def connected(self):
+        return self.state in LinkState.CONNECTED
+
+    def set(self, state, error=None):
+        if error is not None:
+            self.last_error = str(error)
+        if state == self.state:
+            return
+        self.state = state
+        self.since = time.monotonic()
+        LINK_TRANSITIONS.labels(state).inc()
+        if state == LinkState.READY:
+            self.connects += 1
+        for listener in list(self.listeners):
+            try:
+                listener(state, error)
+            except Exception:
+                log.exception('Error in link listener')
+
+    def frame_received(self):
+        self.last_frame_at = time.monotonic()
+        if self.state == LinkState.DEGRADED:
+            self.set(LinkState.READY)
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def to_dict(self):
+        now = time.monotonic()
+        return dict(
+            state=self.state,
+            for_s=round(now - self.since, 3),
+            last_frame_s=(
+                None if self.last_frame_at is None
+                else round(now - self.last_frame_at, 3)
+            ),
+            last_error=self.last_error,
+            connects=self.connects,
+            failures=self.failures,
+        )
+
+
+class DcernoSession:
+    """A multiplexed connection to the D-Cerno central unit.
+
+    Requests get monotonically allocated packet IDs and a pending future
+    each; a single reader thread resolves the future whose ID matches a
+    reply and hands every other frame to the subscribers. Any number of
+    requests can be in flight at once.
+
+    Reconnection is serialized and rate limited with a jittered backoff:
+    while the central unit is unreachable, callers fail fast instead of
+    each one waiting for its own connect timeout.
+
+    Use `shared` to get the session of a central unit; the connection is
+    opened by the first request.
+    """
+    _shared = dict()
+    _shared_lock = Lock()
 
     def __init__(self, host, port, timeout=10):
-        if not self._initialized:
-            self.host = host
-            self.port = port
-            self.timeout = timeout
-            self.socket = None
-            self._initialized = True
-            self._connect()
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.socket = None
+        self.subscribers = []
+        # packet_id -> (socket, future)
+        self._pending = dict()
+        self._pending_lock = Lock()
+        self._send_lock = Lock()
+        self._connect_lock = Lock()
+        self._packet_ids = itertools.count(1)
+        self.link = LinkStatus()
+        self.backoff = Backoff()
+        self._next_attempt_at = 0
+
+    @classmethod
+    def shared(cls, host, port, timeout=10):
+        """Returns the process-wide session of the central unit at
+        `(host, port)`."""
+        key = (host, port)
+        with cls._shared_lock:
+            session = cls._shared.get(key)
+            if session is None:
+                session = cls(host, port, timeout)
+                cls._shared[key] = session
+        return session
+
+    @property
+    def pending(self):
+        return len(self._pending)
 
     @staticmethod
     def mapping_payload(packet_type, packet_id, body_format_type, body):
@@ -43,109 +392,334 @@ class SingletonSocket:
         tx_session = '0'
         room_id = '000'
 
-        header = f"{protocol_id}:{packet_type}{packet_id}{body_format_type}{qos}{tx_type}{tx_id}{rx_type}{rx_id}{tx_prop}{tx_session}{room_id}"
-        packet_length = len(header) + len(body) + 2  # header + body + stx + etx
-        packet = f"{stx}{header}{packet_length:04d}:{body}{etx}"  # format packet length to 4 digits
+        header = (
+            f"{protocol_id}:{packet_type}{packet_id}{body_format_type}{qos}"
+            f"{tx_type}{tx_id}{rx_type}{rx_id}{tx_prop}{tx_session}{room_id}"
+        )
+        # header + body + stx + etx
+        packet_length = len(header) + len(body) + 2
+        # packet length on 4 digits
+        packet = f"{stx}{header}{packet_length:04d}:{body}{etx}"
         return packet
 
+    @staticmethod
+    def connect_body():
+        return {
+            "typ": "Application",
+            "nam": "DU",
+            "ver": "1.01",
+            "inf": "",
+            "svr": 0,
+            "tim": datetime.datetime.now().isoformat()
+        }
+
+    def next_packet_id(self):
+        """Allocates the next free 4-digit packet ID (0001-9999)."""
+        with self._pending_lock:
+            while True:
+                packet_id = f'{next(self._packet_ids) % 10000:04d}'
+                if packet_id != '0000' and packet_id not in self._pending:
+                    return packet_id
+
     def _connect(self):
-        """Establish a new socket connection."""
-        self.close()  # Close existing socket if any
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        try:
-            self.socket.settimeout(self.timeout)
-            self.socket.connect((self.host, self.port))
-
-            connect_body = {
-                "typ": "Application",
-                "nam": "DU",
-                "ver": "1.01",
-                "inf": "",
-                "svr": 0,
-                "tim": datetime.datetime.now().isoformat()
-            }
-            json_body = json.dumps(connect_body)
-            connect_packet = self.mapping_payload('con', '0001', '02', json_body)
+        """Establish a new socket connection and do the `con` handshake."""
+        with self._connect_lock:
+            if self.socket is not None:
+                return self.socket
+
+            wait = self._next_attempt_at - time.monotonic()
+            if wait > 0:
+                raise ClientError(
+                    message='Central unit unreachable, retrying soon.',
+                    meta=f'{self.link.last_error}, next attempt in {wait:.2f}s'
+                )
 
+            self.link.set(LinkState.CONNECTING)
             try:
-                self.send(connect_packet)
-                reply = self.receive(1024)
-                if "rep" not in reply:
-                    raise ClientError(message="Failed to establish connection.", meta=reply)
-                print("Connection established successfully.")
+                sock = socket.create_connection(
+                    (self.host, self.port), self.timeout
+                )
+                # the reader thread blocks until data or disconnection
+                sock.settimeout(None)
+                enable_keepalive(sock)
             except Exception as e:
-                raise ClientError(message="Error during connection.", meta=str(e))
+                self._connect_failed(e)
+                raise ClientError(
+                    message='Cannot connect to socket', meta=str(e)
+                )
 
-            print("Socket connected successfully.")
-        except Exception as e:
-            self.socket = None
-            raise ClientError(message='Cannot connect to socket', meta=str(e))
+            reader = Thread(
+                target=self._read_loop,
+                args=(sock,),
+                name=f'dcerno-reader-{self.host}:{self.port}',
+                daemon=True
+            )
+            reader.start()
+
+            self.link.set(LinkState.HANDSHAKING)
+            try:
+                future = self._submit(sock, 'con', self.connect_body())
+                future.result(self.timeout)
+            except Exception as e:
+                self._disconnect(sock, ClientError(message='Handshake failed.'))
+                self._connect_failed(e)
+                raise ClientError(
+                    message="Error during connection.", meta=str(e)
+                )
+
+            self.socket = sock
+            self.backoff.reset()
+            self._next_attempt_at = 0
+            self.link.set(LinkState.READY)
+            log.info('Connected to %s:%s', self.host, self.port)
+            return sock
+
+    def _connect_failed(self, error):
+        self.link.failures += 1
+        self._next_attempt_at = time.monotonic() + self.backoff.next()
+        self.link.set(LinkState.BACKOFF, error)
+
+    def ensure_connected(self):
+        sock = self.socket
+        if sock is None:
+            log.info('Reconnecting to %s:%s', self.host, self.port)
+            sock = self._connect()
+        return sock
 
-    def send(self, data):
-        """Send data through the socket. Reconnect if needed."""
+    def _submit(self, sock, packet_type, body):
+        packet_id = self.next_packet_id()
+        future = Future()
+        future.request_name = request_name(packet_type, body)
+        future.started_at = time.perf_counter()
+        with self._pending_lock:
+            self._pending[packet_id] = (sock, future)
+
+        packet = self.mapping_payload(
+            packet_type, packet_id, '02', json.dumps(body)
+        )
         try:
-            if self.socket is None:
-                print("Reconnecting socket...")
-                self._connect()
-            self.socket.sendall(data.encode('ascii'))
+            with self._send_lock:
+                sock.sendall(packet.encode('ascii'))
         except Exception as e:
-            print(f"Error sending data: {e}")
-            print("Attempting to reconnect and resend...")
-            self._connect()
-            self.socket.sendall(data.encode('ascii'))
-
-    def receive(self, buffer_size=1024):
-        """Receive data from the socket. Reconnect if needed."""
-        try:
-            if self.socket is None:
-                print("Reconnecting socket...")
-                self._connect()
-            return self.socket.recv(buffer_size).decode('ascii')
+            with self._pending_lock:
+                self._pending.pop(packet_id, None)
+            self._disconnect(
+                sock, ClientError(message=f'Error sending data: {e}')
+            )
+            raise ClientError(message=f'Error sending data: {e}')
+        return future
+
+    def send_request(self, packet_type, body):
+        """Sends a request without waiting, returns a future of the reply
+        `Frame`.
+
+        Reconnects and resends once when the connection was lost.
+        """
+        try:
+            return self._submit(self.ensure_connected(), packet_type, body)
+        except ClientError:
+            log.warning('Send failed, reconnecting and resending')
+            return self._submit(self.ensure_connected(), packet_type, body)
+
+    def request(self, packet_type, body, timeout=None):
+        """Sends a request and waits for its reply `Frame`."""
+        if timeout is None:
+            timeout = self.timeout
+        return self.wait(self.send_request(packet_type, body), timeout)
+
+    def wait(self, future, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            self._forget(future)
+            if self.link.state == LinkState.READY:
+                self.link.set(LinkState.DEGRADED, 'Reply timed out.')
+            raise ClientError(message='Timed out waiting for reply.')
+
+    def _forget(self, future):
+        with self._pending_lock:
+            for packet_id, (_, pending) in list(self._pending.items()):
+                if pending is future:
+                    del self._pending[packet_id]
+                    break
+        future.cancel()
+
+    def _read_loop(self, sock):
+        decoder = FrameDecoder()
+        buffer = bytearray(65536)
+        error = ClientError(message='Connection closed by central unit.')
+        try:
+            while True:
+                size = sock.recv_into(buffer)
+                if not size:
+                    break
+                self.link.frame_received()
+                for frame in decode_frames(decoder, memoryview(buffer)[:size]):
+                    self._dispatch(frame)
         except Exception as e:
-            print(f"Error receiving data: {e}")
-            print("Attempting to reconnect...")
-            self._connect()
-            return self.socket.recv(buffer_size).decode('ascii')
+            error = ClientError(message=f'Error receiving data: {e}')
+        self._disconnect(sock, error)
+
+    def _dispatch(self, frame):
+        FRAMES.labels(frame.packet_type).inc()
+        if frame.packet_type == REPLY_PACKET_TYPE:
+            with self._pending_lock:
+                _, future = self._pending.pop(frame.packet_id, (None, None))
+            if future is not None:
+                if not future.done():
+                    REQUEST_SECONDS.labels(future.request_name).observe(
+                        time.perf_counter() - future.started_at
+                    )
+                    future.set_result(frame)
+                return
+
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber(frame)
+            except Exception:
+                log.exception('Error in frame subscriber')
+
+    def _disconnect(self, sock, error):
+        with self._pending_lock:
+            failed = [
+                packet_id for packet_id, (s, _) in self._pending.items()
+                if s is sock
+            ]
+            futures = [self._pending.pop(packet_id)[1] for packet_id in failed]
+        for future in futures:
+            if not future.done():
+                future.set_exception(error)
+
+        if self.socket is sock:
+            self.socket = None
+            self.link.set(LinkState.CLOSED, error)
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
+
+    def subscribe(self, callback):
+        """Calls `callback(frame)` from the reader thread for unsolicited
+        frames."""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
 
     def close(self):
         """Close the socket if it exists."""
-        if self.socket:
-            try:
-                self.socket.close()
-                self.socket = None
-                print("Socket connection closed.")
-            except Exception as e:
-                print(f"Error closing socket: {e}")
+        sock = self.socket
+        if sock:
+            self._disconnect(sock, ClientError(message='Connection closed.'))
+            log.info('Connection to %s:%s closed', self.host, self.port)
+
+
+class DcernoPool(object):
+    """A few `DcernoSession`s to the same central unit.
+
+    A request goes to the connected session with the fewest replies
+    pending. Unsolicited frames are only delivered from the first
+    session, so subscribers see every push once.
+    """
+    _shared = dict()
+    _shared_lock = Lock()
+
+    def __init__(self, host, port, size=2, timeout=10):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sessions = [
+            DcernoSession(host, port, timeout) for _ in range(size)
+        ]
+        self.link = self.sessions[0].link
+
+    @classmethod
+    def shared(cls, host, port, size=2, timeout=10):
+        key = (host, port)
+        with cls._shared_lock:
+            pool = cls._shared.get(key)
+            if pool is None:
+                pool = cls(host, port, size, timeout)
+                cls._shared[key] = pool
+        return pool
+
+    def _pick(self):
+        # sessions waiting out a backoff are only used when all are
+        return min(
+            self.sessions,
+            key=lambda session: (
+                session.link.state == LinkState.BACKOFF, session.pending
+            )
+        )
+
+    def send_request(self, packet_type, body):
+        session = self._pick()
+        future = session.send_request(packet_type, body)
+        future.session = session
+        return future
+
+    def request(self, packet_type, body, timeout=None):
+        return self.wait(self.send_request(packet_type, body), timeout)
+
+    def wait(self, future, timeout=None):
+        return future.session.wait(future, timeout)
+
+    def ensure_connected(self):
+        return self.sessions[0].ensure_connected()
+
+    def subscribe(self, callback):
+        self.sessions[0].subscribe(callback)
+
+    def unsubscribe(self, callback):
+        self.sessions[0].unsubscribe(callback)
+
+    def close(self):
+        for session in self.sessions:
+            session.close()
 
 
 class DcernoClient:
-    def __init__(self, host, port, timeout=10):
+    """Blocking client of a central unit, safe to share between threads.
+
+    Clients of the same `(host, port)` share one multiplexed session, or a
+    `DcernoPool` of `pool_size` sessions.
+    """
+
+    def __init__(self, host, port, timeout=10, pool_size=1):
         self.host = host
         self.port = port
         self.timeout = timeout
-        self.socket_manager = SingletonSocket(host, port, timeout)
+        if pool_size > 1:
+            self.session = DcernoPool.shared(host, port, pool_size, timeout)
+        else:
+            self.session = DcernoSession.shared(host, port, timeout)
+        self._events = None
 
     def connect(self):
-        connect_body = {
-            "typ": "Application",
-            "nam": "DU",
-            "ver": "1.01",
-            "inf": "",
-            "svr": 0,
-            "tim": datetime.datetime.now().isoformat()
-        }
-        json_body = json.dumps(connect_body)
-        connect_packet = self.mapping_payload('con', '0001', '02', json_body)
-
         try:
-            self.socket_manager.send(connect_packet)
-            reply = self.socket_manager.receive(1024)
-            if "rep" not in reply:
-                raise ClientError(message="Failed to establish connection.", meta=reply)
-            print("Connection established successfully.")
+            self.session.request(
+                'con', DcernoSession.connect_body(), self.timeout
+            )
+            log.info('Handshake with %s:%s done', self.host, self.port)
         except Exception as e:
             raise ClientError(message="Error during connection.", meta=str(e))
 
+    def send_request(self, body, packet_type='get'):
+        """Sends a request without waiting for the reply.
+
+        Returns a future to pass to `wait_reply`; several requests can be
+        in flight at once, so N requests cost about one round trip.
+        """
+        return self.session.send_request(packet_type, body)
+
+    def wait_reply(self, future):
+        """Waits for a reply future and returns its body."""
+        return self.session.wait(future, self.timeout).body
+
     def get_all_units(self):
         """Retrieves all units from the D-Cerno system."""
 
@@ -154,62 +728,19 @@ class DcernoClient:
             get_units_body = {
                 "nam": "gunits"
             }
-            json_body = json.dumps(get_units_body)
-            get_units_packet = self.mapping_payload('get', '0002', '02', json_body)  # packet ID is 0002
-            print(f"Sending get all units packet: {get_units_packet}")
-
-            # Send the packet
-            self.socket_manager.send(get_units_packet)
-
-            # Receive and handle the reply
-            reply = self.socket_manager.receive(1024)
-            print(f"Received reply: {reply}")
-            if reply:
-                print("Successfully retrieved all units.")
-                if 'micstat' in reply and 'units' not in reply:
-                    json_data = re.search(r'{.*}', reply, re.DOTALL).group()
-                    parsed_data = json.loads(json_data)
-                    if parsed_data.get('nam') == 'micstat':
-                        return {
-                            'nam': parsed_data.get('nam'),
-                            's': [
-                                dict(uid=parsed_data.get('uid'), stat=parsed_data.get('stat'))
-                            ]
-                        }
-                else:
-                    pattern = r'02:[a-zA-Z0-9]+:\{\s*("nam":\s*"units",\s*"s":\s*\[.*?\])\s*\}'
-                    matches = re.finditer(pattern, reply, re.DOTALL)
-                    for match in matches:
-                        try:
-                            # Extract and parse the JSON
-                            parsed_data = "{" + match.group(1) + "}"
-                            parsed_data = json.loads(parsed_data)
-                            return parsed_data
-                        except Exception as e:
-                            print('Cannot decode reply get unit', e)
-            raise ClientError(message="Error retrieving all units.")
+            log.debug('Sending get all units packet: %s', get_units_body)
+            reply = self.session.request('get', get_units_body, self.timeout)
+            log.debug('Received reply: %s', reply.body)
+            return reply.body
         except Exception as e:
             raise ClientError(message=f"Error retrieving all units: {e}")
 
     @staticmethod
     def mapping_payload(packet_type, packet_id, body_format_type, body):
         """Creates a TCCP packet string."""
-        stx = '\x02'  # Start of text character
-        etx = '\x03'  # End of text character
-        protocol_id = '02'
-        qos = '0'
-        tx_type = 'O'  # Application
-        tx_id = '00000'
-        rx_type = 'C'  # Central Unit
-        rx_id = '00000'
-        tx_prop = '0'
-        tx_session = '0'
-        room_id = '000'
-
-        header = f"{protocol_id}:{packet_type}{packet_id}{body_format_type}{qos}{tx_type}{tx_id}{rx_type}{rx_id}{tx_prop}{tx_session}{room_id}"
-        packet_length = len(header) + len(body) + 2  # header + body + stx + etx
-        packet = f"{stx}{header}{packet_length:04d}:{body}{etx}"  # format packet length to 4 digits
-        return packet
+        return DcernoSession.mapping_payload(
+            packet_type, packet_id, body_format_type, body
+        )
 
     def get_microphone_status(self, uid='0'):
         """Retrieves the microphone status from the D-Cerno system."""
@@ -219,29 +750,405 @@ class DcernoClient:
                 "nam": "gmicstat",
                 "uid": uid  # '0' for all microphones, or a specific serial
             }
-            json_body = json.dumps(get_mic_status_body)
-            get_mic_status_packet = self.mapping_payload('get', '0003', '02', json_body)  # packet ID is 0002
-            print(f"Sending get microphone status packet: {get_mic_status_packet}")
-
-            # Send the packet
-            self.socket_manager.send(get_mic_status_packet)
-
-            # Receive and handle the reply
-            reply = self.socket_manager.receive(1024)
-            print(f"Received reply: {reply}")
-
-            if reply:
-                json_data = re.search(r'{.*}', reply, re.DOTALL).group()
-                parsed_data = json.loads(json_data)
-                return parsed_data
-            raise ClientError(message="Error retrieving microphone status.")
+            log.debug('Sending get microphone status packet: %s',
+                      get_mic_status_body)
+            reply = self.session.request(
+                'get', get_mic_status_body, self.timeout
+            )
+            log.debug('Received reply: %s', reply.body)
+            return reply.body
+        except Exception as e:
+            raise ClientError(
+                message=f"Error retrieving microphone status: {e}"
+            )
+
+    def get_microphone_statuses(self, uids=None):
+        """Retrieves the status of many microphones as `{uid: status}`.
+
+        Without `uids` a single `gmicstat` request for uid '0' covers all
+        microphones, otherwise the per-uid requests are pipelined.
+        """
+        try:
+            if uids is None:
+                reply = self.session.request(
+                    'get', {"nam": "gmicstat", "uid": "0"}, self.timeout
+                )
+                return map_microphone_statuses(reply.body)
+
+            futures = [
+                self.send_request({"nam": "gmicstat", "uid": uid})
+                for uid in uids
+            ]
+            statuses = dict()
+            for future in futures:
+                body = self.wait_reply(future)
+                statuses.update(map_microphone_statuses(body))
+            return statuses
+        except Exception as e:
+            raise ClientError(
+                message=f"Error retrieving microphone statuses: {e}"
+            )
+
+    def _on_frame(self, frame):
+        if frame.nam != 'micstat':
+            return
+        try:
+            self._events.put_nowait(
+                dict(uid=frame.body.get('uid'), stat=frame.body.get('stat'))
+            )
+        except queue.Full:
+            # the tracker reconciliation catches up on dropped events
+            pass
+
+    def wait_for_events(self, timeout=1):
+        """Waits for micstat frames pushed by the central unit.
+
+        Returns a list of `{'uid': ..., 'stat': ...}` dicts, empty when
+        nothing arrived within `timeout` seconds.
+        """
+        if self._events is None:
+            self._events = queue.Queue(maxsize=1024)
+            self.session.subscribe(self._on_frame)
+        self.session.ensure_connected()
+
+        events = []
+        try:
+            events.append(self._events.get(timeout=timeout))
+            while True:
+                events.append(self._events.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+    def close(self):
+        if self._events is not None:
+            self.session.unsubscribe(self._on_frame)
+            self._events = None
+
+
+class AsyncDcernoClient:
+    """asyncio counterpart of `DcernoClient` built on `asyncio.open_connection`.
+
+    Requests are multiplexed by packet ID like `DcernoSession`, so any
+    number of coroutines can await replies on the same connection. Use
+    `shared` to get the process-wide client of a central unit.
+
+    A link silent for `heartbeat_interval` seconds is probed with a
+    request; without a reply within `heartbeat_timeout` the connection is
+    dropped, so a half-open socket is noticed within a few seconds. State
+    changes are published on `link`. After a failed attempt, `connect`
+    fails fast until the backoff delay has passed.
+    """
+    _shared = dict()
+
+    def __init__(self,
+                 host,
+                 port,
+                 timeout=10,
+                 heartbeat_interval=2.0,
+                 heartbeat_timeout=1.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.writer = None
+        self.subscribers = []
+        self.link = LinkStatus()
+        self.backoff = Backoff()
+        self._next_attempt_at = 0
+        self._reader_task = None
+        self._heartbeat_task = None
+        # packet_id -> (writer, future)
+        self._pending = dict()
+        self._packet_ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+
+    @classmethod
+    def shared(cls, host, port):
+        """Returns the client of the central unit at `(host, port)` for the
+        running event loop, one connection whatever the caller.
+
+        The streams, reader task and lock belong to the loop that created
+        them, so each loop, e.g. each app lifespan, gets its own client;
+        `close_shared` closes those of the running loop. Callers pass their
+        own `timeout` to the requests.
+        """
+        loop = asyncio.get_running_loop()
+        key = (host, port, loop)
+        client = cls._shared.get(key)
+        if client is None:
+            for other in [k for k in cls._shared if k[2].is_closed()]:
+                del cls._shared[other]
+            client = cls(host, port)
+            cls._shared[key] = client
+        return client
+
+    @classmethod
+    async def close_shared(cls):
+        """Closes and forgets the shared clients of the running loop."""
+        loop = asyncio.get_running_loop()
+        for key in [k for k in cls._shared if k[2] is loop]:
+            await cls._shared.pop(key).close()
+
+    def next_packet_id(self):
+        """Allocates the next free 4-digit packet ID (0001-9999)."""
+        while True:
+            packet_id = f'{next(self._packet_ids) % 10000:04d}'
+            if packet_id != '0000' and packet_id not in self._pending:
+                return packet_id
+
+    async def connect(self, timeout=None):
+        """Opens the connection and does the `con` handshake."""
+        if timeout is None:
+            timeout = self.timeout
+        async with self._connect_lock:
+            if self.writer is not None:
+                return self.writer
+
+            wait = self.retry_in()
+            if wait > 0:
+                raise ClientError(
+                    message='Central unit unreachable, retrying soon.',
+                    meta=f'{self.link.last_error}, next attempt in {wait:.2f}s'
+                )
+
+            self.link.set(LinkState.CONNECTING)
+            try:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port),
+                    timeout
+                )
+            except (OSError, asyncio.TimeoutError) as e:
+                self._connect_failed(e)
+                raise ClientError(
+                    message='Cannot connect to socket', meta=str(e)
+                )
+
+            sock = writer.get_extra_info('socket')
+            if sock is not None:
+                enable_keepalive(sock)
+            self._reader_task = asyncio.create_task(
+                self._read_loop(reader, writer)
+            )
+
+            self.link.set(LinkState.HANDSHAKING)
+            try:
+                await self._request_on(
+                    writer, 'con', DcernoSession.connect_body(), timeout
+                )
+            except Exception as e:
+                self._disconnect(
+                    writer, ClientError(message='Handshake failed.')
+                )
+                self._connect_failed(e)
+                raise ClientError(
+                    message="Error during connection.", meta=str(e)
+                )
+            except BaseException:
+                # cancelled by the caller, e.g. a shorter `wait_for`; the
+                # reader task ends once the writer is closed
+                self._disconnect(
+                    writer, ClientError(message='Handshake cancelled.')
+                )
+                self.link.set(LinkState.CLOSED, 'Handshake cancelled.')
+                raise
+
+            self.writer = writer
+            self.backoff.reset()
+            self._next_attempt_at = 0
+            self.link.set(LinkState.READY)
+            if self.heartbeat_interval:
+                self._heartbeat_task = asyncio.create_task(
+                    self._heartbeat_loop(writer)
+                )
+            return writer
+
+    def _connect_failed(self, error):
+        self.link.failures += 1
+        self._next_attempt_at = time.monotonic() + self.backoff.next()
+        self.link.set(LinkState.BACKOFF, error)
+
+    def retry_in(self):
+        """Seconds until `connect` will try again, 0 when it can now."""
+        return max(0, self._next_attempt_at - time.monotonic())
+
+    async def _heartbeat_loop(self, writer):
+        while self.writer is writer:
+            await asyncio.sleep(self.heartbeat_interval)
+            last_frame_at = self.link.last_frame_at or 0
+            if time.monotonic() - last_frame_at < self.heartbeat_interval:
+                continue
+            try:
+                await self._request_on(
+                    writer, 'get', HEARTBEAT_BODY, self.heartbeat_timeout
+                )
+            except ClientError:
+                self._disconnect(
+                    writer, ClientError(message='Heartbeat timed out.')
+                )
+                return
+
+    async def _request_on(self, writer, packet_type, body, timeout):
+        loop = asyncio.get_running_loop()
+        packet_id = self.next_packet_id()
+        future = loop.create_future()
+        self._pending[packet_id] = (writer, future)
+
+        packet = DcernoSession.mapping_payload(
+            packet_type, packet_id, '02', json.dumps(body)
+        )
+        try:
+            writer.write(packet.encode('ascii'))
+            await writer.drain()
         except Exception as e:
-            raise ClientError(message=f"Error retrieving microphone status: {e}")
+            self._pending.pop(packet_id, None)
+            self._disconnect(
+                writer, ClientError(message=f'Error sending data: {e}')
+            )
+            raise ClientError(message=f'Error sending data: {e}')
+
+        started = time.perf_counter()
+        try:
+            frame = await asyncio.wait_for(future, timeout)
+            REQUEST_SECONDS.labels(request_name(packet_type, body)).observe(
+                time.perf_counter() - started
+            )
+            return frame
+        except asyncio.TimeoutError:
+            if self.writer is writer and self.link.state == LinkState.READY:
+                self.link.set(LinkState.DEGRADED, 'Reply timed out.')
+            raise ClientError(message='Timed out waiting for reply.')
+        finally:
+            self._pending.pop(packet_id, None)
+
+    async def request(self, packet_type, body, timeout=None):
+        """Sends a request and awaits its reply `Frame`.
+
+        Concurrent calls are pipelined on the same connection.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        writer = self.writer
+        if writer is None:
+            writer = await self.connect(timeout)
+        return await self._request_on(writer, packet_type, body, timeout)
+
+    async def _read_loop(self, reader, writer):
+        decoder = FrameDecoder()
+        error = ClientError(message='Connection closed by central unit.')
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                self.link.frame_received()
+                for frame in decode_frames(decoder, data):
+                    self._dispatch(frame)
+        except Exception as e:
+            error = ClientError(message=f'Error receiving data: {e}')
+        self._disconnect(writer, error)
+
+    def _dispatch(self, frame):
+        FRAMES.labels(frame.packet_type).inc()
+        if frame.packet_type == REPLY_PACKET_TYPE:
+            _, future = self._pending.pop(frame.packet_id, (None, None))
+            if future is not None:
+                if not future.done():
+                    future.set_result(frame)
+                return
+
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber(frame)
+            except Exception:
+                log.exception('Error in frame subscriber')
+
+    def _disconnect(self, writer, error):
+        for packet_id, (w, future) in list(self._pending.items()):
+            if w is not writer:
+                continue
+            del self._pending[packet_id]
+            if not future.done():
+                future.set_exception(error)
+
+        if self.writer is writer:
+            self.writer = None
+            heartbeat = self._heartbeat_task
+            self._heartbeat_task = None
+            if (heartbeat is not None
+                    and heartbeat is not asyncio.current_task()):
+                heartbeat.cancel()
+            self.link.set(LinkState.CLOSED, error)
+        writer.close()
+
+    def subscribe(self, callback):
+        """Calls `callback(frame)` for unsolicited frames."""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    async def get_all_units(self, timeout=None):
+        """Retrieves all units from the D-Cerno system."""
+        try:
+            reply = await self.request('get', {"nam": "gunits"}, timeout)
+            return reply.body
+        except Exception as e:
+            raise ClientError(message=f"Error retrieving all units: {e}")
+
+    async def get_microphone_status(self, uid='0', timeout=None):
+        """Retrieves the microphone status from the D-Cerno system."""
+        try:
+            reply = await self.request(
+                'get', {"nam": "gmicstat", "uid": uid}, timeout
+            )
+            return reply.body
+        except Exception as e:
+            raise ClientError(
+                message=f"Error retrieving microphone status: {e}"
+            )
+
+    async def get_microphone_statuses(self, uids=None, timeout=None):
+        """Retrieves the status of many microphones as `{uid: status}`.
+
+        Without `uids` a single `gmicstat` request for uid '0' covers all
+        microphones, otherwise the per-uid requests are pipelined.
+        """
+        try:
+            if uids is None:
+                reply = await self.request(
+                    'get', {"nam": "gmicstat", "uid": "0"}, timeout
+                )
+                return map_microphone_statuses(reply.body)
+
+            replies = await asyncio.gather(*[
+                self.request('get', {"nam": "gmicstat", "uid": uid}, timeout)
+                for uid in uids
+            ])
+            statuses = dict()
+            for reply in replies:
+                statuses.update(map_microphone_statuses(reply.body))
+            return statuses
+        except Exception as e:
+            raise ClientError(
+                message=f"Error retrieving microphone statuses: {e}"
+            )
+
+    async def close(self):
+        writer = self.writer
+        if writer is not None:
+            self._disconnect(writer, ClientError(message='Connection closed.'))
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
 
 
 if __name__ == "__main__":
     d = DcernoClient(host='192.168.0.20', port=5011)
     units = d.get_all_units()
-    for unit in units['s']:
-        unit_info = d.get_microphone_status(unit['uid'])  # get status for all mics
+    statuses = d.get_microphone_statuses([unit['uid'] for unit in units['s']])
+    for uid, unit_info in statuses.items():
         print(unit_info)
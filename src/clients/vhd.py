@@ -1,14 +1,44 @@
+import time
+import asyncio
+from functools import partial
 from json import JSONDecodeError
+from threading import Lock
 from src.bases.client import Client
 from src.bases.error.client import ClientError
+from src.bases.request_handler import make_session
+from src.common.metrics import Histogram
+
+COMMAND_SECONDS = Histogram(
+    'vhd_command_seconds',
+    'Latency of a VHD `ptzcmd` request, by action and HTTP status.',
+    ('action', 'status'),
+)
 
 
 class VHDClient(Client):
-    def __init__(self, uri, logger):
+    _shared = dict()
+    _shared_lock = Lock()
+
+    def __init__(self, uri, logger, timeout=None, pool_maxsize=4):
         self.uri = uri
         self.logger = logger
 
-        super().__init__(logger=logger)
+        super().__init__(
+            logger=logger,
+            session=make_session(pool_maxsize=pool_maxsize),
+            timeout=timeout,
+        )
+
+    @classmethod
+    def shared(cls, uri, logger=None, **kwargs):
+        """Returns the process-wide client of a camera, keeping its
+        connections alive between calls."""
+        with cls._shared_lock:
+            client = cls._shared.get(uri)
+            if client is None:
+                client = cls(uri=uri, logger=logger, **kwargs)
+                cls._shared[uri] = client
+        return client
 
     def call(self, action, position=None, zoom=None):
         params = ['ptzcmd', action]
@@ -19,13 +49,20 @@ class VHDClient(Client):
             params.append(zoom)
         params = '&'.join(params)
         url = self.uri + f'/cgi-bin/ptzctrl.cgi?{params}'
+        started = time.perf_counter()
         try:
             response = self._do_request(
                 method='get',
                 url=url,
             )
         except Exception as e:
+            COMMAND_SECONDS.labels(action, 'error').observe(
+                time.perf_counter() - started
+            )
             raise ClientError(e.args)
+        COMMAND_SECONDS.labels(action, str(response.status_code)).observe(
+            time.perf_counter() - started
+        )
 
         if response.status_code != 200:
             raise ClientError(message='SetCamFailed: error code: ' + str(response.status_code))
@@ -50,3 +87,151 @@ class VHDClient(Client):
             return response.text
         except Exception as e:
             raise ClientError(e.args)
+
+
+class CommandResult(object):
+    """Outcome of a command sent through `AsyncVHDClient`."""
+    EXECUTED = 'executed'
+    SUPERSEDED = 'superseded'
+
+    __slots__ = ('action', 'position', 'zoom', 'status', 'response',
+                 'submitted_at', 'finished_at')
+
+    def __init__(self, command, status, submitted_at, finished_at,
+                 response=None):
+        self.action = command['action']
+        self.position = command['position']
+        self.zoom = command['zoom']
+        self.status = status
+        self.response = response
+        self.submitted_at = submitted_at
+        self.finished_at = finished_at
+
+    @property
+    def executed(self):
+        return self.status == self.EXECUTED
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class AsyncVHDClient(object):
+    """asyncio PTZ client that only ever sends the latest target.
+
+    Each camera has one command in flight and one waiting slot. A new
+    command replaces the waiting one, whose caller gets a `superseded`
+    result immediately, so a burst of speaker changes costs at most two
+    moves and the camera converges on the last target. The command in
+    flight has already reached the camera and always reports `executed`.
+    HTTP calls run on the pooled `VHDClient` in the default executor.
+    """
+    _shared = dict()
+
+    def __init__(self, uri, logger=None, client=None):
+        self.uri = uri
+        self.logger = logger
+        self.client = client or VHDClient.shared(uri=uri, logger=logger)
+
+        self.executed = 0
+        self.superseded = 0
+
+        # (command, future, submitted_at) waiting to be sent
+        self._waiting = None
+        self._in_flight = None
+        self._worker = None
+
+    @classmethod
+    def shared(cls, uri, logger=None):
+        """Returns the client of `uri` for the running event loop.
+
+        The worker task and futures belong to the loop that created them,
+        so each loop, e.g. each `asyncio.run`, gets its own client.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        key = (uri, loop)
+        client = cls._shared.get(key)
+        if client is None:
+            for other in [k for k in cls._shared
+                          if k[1] is not None and k[1].is_closed()]:
+                del cls._shared[other]
+            client = cls(uri=uri, logger=logger)
+            cls._shared[key] = client
+        return client
+
+    @property
+    def busy(self):
+        return self._in_flight is not None or self._waiting is not None
+
+    def submit(self, action, position=None, zoom=None):
+        """Queues a command and returns a future of its `CommandResult`."""
+        loop = asyncio.get_running_loop()
+        command = dict(action=action, position=position, zoom=zoom)
+        future = loop.create_future()
+
+        self._drop_waiting()
+        self._waiting = (command, future, time.monotonic())
+
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        return future
+
+    async def call(self, action, position=None, zoom=None):
+        """Sends a command, returns its `CommandResult`.
+
+        Raises `ClientError` when the camera rejected an executed command.
+        """
+        return await self.submit(action, position=position, zoom=zoom)
+
+    def cancel(self):
+        """Drops the waiting command, if any."""
+        self._drop_waiting()
+
+    def _drop_waiting(self):
+        if self._waiting is None:
+            return
+        command, future, submitted_at = self._waiting
+        self._waiting = None
+        self.superseded += 1
+        if not future.done():
+            future.set_result(CommandResult(
+                command,
+                CommandResult.SUPERSEDED,
+                submitted_at=submitted_at,
+                finished_at=time.monotonic(),
+            ))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._waiting is not None:
+            command, future, submitted_at = self._waiting
+            self._waiting = None
+            self._in_flight = command
+            try:
+                response = await loop.run_in_executor(
+                    None, partial(self.client.call, **command)
+                )
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(
+                        e if isinstance(e, ClientError) else ClientError(e.args)
+                    )
+                continue
+            finally:
+                self._in_flight = None
+
+            self.executed += 1
+            if not future.done():
+                future.set_result(CommandResult(
+                    command,
+                    CommandResult.EXECUTED,
+                    submitted_at=submitted_at,
+                    finished_at=time.monotonic(),
+                    response=response,
+                ))
+
+    async def ping(self):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.client.ping)
@@ -0,0 +1,29 @@
+import random
+
+
+class Backoff(object):
+    """Jittered exponential backoff.
+
+    The n-th delay is `initial * factor ** n` capped at `maximum`, less a
+    random share of up to `jitter` of it, so clients that lost the same
+    link do not reconnect in lockstep.
+    """
+
+    def __init__(self, initial=0.1, maximum=5.0, factor=2.0, jitter=0.5):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.attempts = 0
+
+    def next(self):
+        delay = self.initial * self.factor ** self.attempts
+        if delay < self.maximum:
+            # stops growing once capped, `factor ** n` would overflow
+            self.attempts += 1
+        else:
+            delay = self.maximum
+        return delay * (1 - self.jitter * random.random())
+
+    def reset(self):
+        self.attempts = 0
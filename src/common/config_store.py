@@ -0,0 +1,235 @@
+import os
+import json
+import stat
+import time
+import tempfile
+from contextlib import contextmanager
+from threading import Lock, RLock
+
+try:
+    import fcntl
+except ImportError:  # Windows, only threads are serialized
+    fcntl = None
+
+from config import DECERNO_VHD_MAPPING_PATH, DECERNO_VHD_SETTING_PATH
+
+# read once at import, `os.umask` can only be read by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class JsonFileStore(object):
+    """A JSON file kept in memory and reloaded only when it changes.
+
+    The file is stat'ed at most once per `check_interval` seconds and
+    parsed again only when its inode, mtime or size differ, so readers in
+    a hot loop do no filesystem syscalls in between. A file that fails to
+    parse keeps the last good data.
+
+    Writes go to a temporary file that is fsync'ed and renamed over the
+    target, so readers never see a partial file. Writers, across threads
+    and processes, are serialized with a lock on `<path>.lock`.
+    """
+
+    _instances = dict()
+    _instances_lock = Lock()
+
+    def __init__(self, path, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+
+        self._data = dict()
+        self._stat_key = None
+        self._next_check = 0
+        self._lock = Lock()
+        self._write_lock = RLock()
+
+    @classmethod
+    def for_path(cls, path, **kwargs):
+        """Returns the store of `path` shared by the whole process."""
+        key = (cls, os.path.abspath(path))
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = cls(path, **kwargs)
+                cls._instances[key] = store
+        return store
+
+    def _read_stat_key(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _reload(self):
+        stat_key = self._read_stat_key()
+        if stat_key == self._stat_key:
+            return
+
+        if stat_key is None:
+            data = dict()
+        else:
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f) or dict()
+            except ValueError:
+                # retry on the next check, the writer has not finished
+                return
+            except FileNotFoundError:
+                data = dict()
+
+        self._data = data
+        self._stat_key = stat_key
+
+    def reload(self):
+        """Checks the file now, ignoring `check_interval`."""
+        with self._lock:
+            self._reload()
+            self._next_check = time.monotonic() + self.check_interval
+
+    def get(self):
+        """Returns the current data, do not mutate it."""
+        now = time.monotonic()
+        if now >= self._next_check:
+            with self._lock:
+                if now >= self._next_check:
+                    self._reload()
+                    self._next_check = now + self.check_interval
+        return self._data
+
+    def copy(self):
+        return dict(self.get())
+
+    @contextmanager
+    def _file_lock(self):
+        with self._write_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.path + '.lock', 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _file_mode(self):
+        try:
+            return stat.S_IMODE(os.stat(self.path).st_mode)
+        except FileNotFoundError:
+            return 0o666 & ~_UMASK
+
+    def _write(self, data):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory,
+            prefix=f'.{os.path.basename(self.path)}.',
+            suffix='.tmp'
+        )
+        try:
+            with os.fdopen(fd, 'w') as f:
+                # mkstemp creates 0600, keep the mode `open` would give
+                os.fchmod(f.fileno(), self._file_mode())
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._data = data
+            self._stat_key = self._read_stat_key()
+            self._next_check = time.monotonic() + self.check_interval
+
+    def write(self, data):
+        with self._file_lock():
+            self._write(data)
+
+    @contextmanager
+    def transaction(self):
+        """Read-modify-write under the file lock.
+
+        Yields a fresh copy of the file content; it is written back
+        atomically when the block exits without an exception.
+        """
+        with self._file_lock():
+            self.reload()
+            data = self.copy()
+            yield data
+            self._write(data)
+
+
+class MappingStore(JsonFileStore):
+    """Microphone uid -> camera preset number.
+
+    A uid can also map to `{camera_id: preset}` when several cameras can
+    frame the microphone; a plain preset belongs to the default camera.
+    """
+
+    def get_preset(self, uid):
+        value = self.get().get(uid)
+        if isinstance(value, dict):
+            return next(iter(value.values()), None)
+        return value
+
+    @staticmethod
+    def targets_of(value, default_camera):
+        """Returns `{camera_id: preset}` of a mapping value."""
+        if not value:
+            return dict()
+        if isinstance(value, dict):
+            return {
+                camera_id: str(preset)
+                for camera_id, preset in value.items()
+                if preset
+            }
+        return {default_camera: str(value)}
+
+    @staticmethod
+    def with_preset(value, camera_id, preset, default_camera):
+        """Returns the mapping value `value` with `camera_id` at `preset`.
+
+        A uid only on the default camera keeps the plain preset form.
+        """
+        if not isinstance(value, dict) and camera_id == default_camera:
+            return str(preset)
+        targets = MappingStore.targets_of(value, default_camera)
+        targets[camera_id] = str(preset)
+        return targets
+
+    def get_targets(self, uid, default_camera):
+        """Returns `{camera_id: preset}` for `uid`."""
+        return self.targets_of(self.get().get(uid), default_camera)
+
+    def get_target(self, uid, default_camera):
+        """Returns the first `(camera_id, preset)` of `uid`, or None."""
+        return next(
+            iter(self.get_targets(uid, default_camera).items()), None
+        )
+
+    def has_preset(self, uid):
+        return bool(self.get().get(uid))
+
+    def is_empty(self):
+        return not self.get()
+
+
+class SettingsStore(JsonFileStore):
+    """Tracking settings shared by the API and the tracker."""
+
+    @property
+    def tracking_enabled(self):
+        return bool(self.get().get('tracking_enabled'))
+
+    def set_tracking_enabled(self, value):
+        with self.transaction() as settings:
+            settings['tracking_enabled'] = value
+        return settings
+
+
+mapping_store = MappingStore.for_path(DECERNO_VHD_MAPPING_PATH)
+settings_store = SettingsStore.for_path(DECERNO_VHD_SETTING_PATH)
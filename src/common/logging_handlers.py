@@ -0,0 +1,84 @@
+import sys
+import json
+import queue
+import atexit
+import logging
+import itertools
+from datetime import datetime, timezone
+from logging import Formatter
+from logging.handlers import QueueHandler, QueueListener
+
+
+class LoggingJsonFormatter(Formatter):
+    def format(self, record):
+        json_record = {
+            'timestamp': datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            'message': record.getMessage(),
+        }
+
+        data = getattr(record, 'data', dict())
+
+        for k, v in data.items():
+            json_record[k] = v
+
+        if record.levelno >= logging.ERROR and record.exc_info:
+            json_record['err'] = self.formatException(record.exc_info)
+
+        return json.dumps(json_record, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queues records as they are, without formatting them.
+
+    `QueueHandler` renders the message in the logging thread; here
+    `getMessage`, the payload `repr`s and the JSON encoding all run on the
+    listener thread. Arguments must not be mutated after being logged.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _QueueListener(QueueListener):
+    def stop(self):
+        # stopped at exit as well, the second call is a no-op
+        if self._thread is not None:
+            super().stop()
+
+
+def setup_queue_logging(logger,
+                        formatter=None,
+                        level=logging.INFO,
+                        stream=None):
+    """Sends the records of `logger` through a queue to a writer thread.
+
+    Returns the started `QueueListener`, stopped at exit so queued
+    records are flushed.
+    """
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(formatter or LoggingJsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    listener = _QueueListener(log_queue, handler, respect_handler_level=True)
+    logger.handlers = [DeferredQueueHandler(log_queue)]
+    logger.setLevel(level)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+class LogSampler(object):
+    """Lets one in every `every` calls through, for per-tick messages.
+
+        if sampler.ready() and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(...)
+    """
+
+    def __init__(self, every=100):
+        self.every = every
+        self._calls = itertools.count()
+
+    def ready(self):
+        return next(self._calls) % self.every == 0
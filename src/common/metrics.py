@@ -0,0 +1,277 @@
+"""In-process metrics rendered in the Prometheus text format.
+
+Counters and histograms keep one shard of values per thread: a thread
+only ever writes its own shard, so updates take no lock and never lose
+increments, and a scrape sums the shards. The lock is only taken the
+first time a thread touches a labelled series.
+
+    REQUESTS = Counter('app_requests_total', 'Requests.', ('path',))
+    REQUESTS.labels('/ping').inc()
+    render()  # text for a /metrics endpoint
+"""
+import bisect
+import threading
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# seconds, from sub-millisecond decode times to slow camera moves
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Registry(object):
+    def __init__(self):
+        self.metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in list(self.metrics):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def _escape(value):
+    return (str(value).replace('\\', r'\\')
+            .replace('\n', r'\n').replace('"', r'\"'))
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Sharded(object):
+    """Values of one series, one list per writing thread."""
+
+    def __init__(self, size):
+        self.size = size
+        self.shards = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def shard(self):
+        try:
+            return self._local.values
+        except AttributeError:
+            values = [0] * self.size
+            with self._lock:
+                self.shards.append(values)
+            self._local.values = values
+            return values
+
+    def totals(self):
+        totals = [0] * self.size
+        for shard in list(self.shards):
+            for index, value in enumerate(shard):
+                totals[index] += value
+        return totals
+
+
+class Metric(object):
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = dict()
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._new_child()
+        if registry is not None:
+            registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Returns the series of `values`, in `labelnames` order."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f'{self.name} expects labels {self.labelnames}'
+                )
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _series(self):
+        if not self.labelnames:
+            return [((), self._default)]
+        return list(self._children.items())
+
+    def render(self):
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+        for values, child in self._series():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child):
+        raise NotImplementedError
+
+
+class _CounterChild(object):
+    def __init__(self):
+        self._values = _Sharded(1)
+
+    def inc(self, amount=1):
+        self._values.shard()[0] += amount
+
+    def get(self):
+        return self._values.totals()[0]
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def get(self):
+        return self._default.get()
+
+    def _render_child(self, values, child):
+        labels = _format_labels(self.labelnames, values)
+        return [f'{self.name}{labels} {_format_value(child.get())}']
+
+
+class _GaugeChild(object):
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class Gauge(Metric):
+    """A value that is set, last write wins."""
+    type = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default.set(value)
+
+    def get(self):
+        return self._default.get()
+
+    def _render_child(self, values, child):
+        labels = _format_labels(self.labelnames, values)
+        return [f'{self.name}{labels} {_format_value(child.get())}']
+
+
+class _HistogramChild(object):
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # bucket counts, +Inf count, sum
+        self._values = _Sharded(len(buckets) + 2)
+
+    def observe(self, value):
+        shard = self._values.shard()
+        shard[bisect.bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def totals(self):
+        return self._values.totals()
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def _render_child(self, values, child):
+        totals = child.totals()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), totals):
+            cumulative += count
+            labels = _format_labels(
+                self.labelnames, values, f'le="{_format_value(float(bound))}"'
+            )
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f'{self.name}_sum{labels} {_format_value(totals[-1])}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+def render(registry=REGISTRY):
+    return registry.render()
+
+
+def start_http_server(port, host='0.0.0.0', registry=REGISTRY):
+    """Serves `GET /metrics` from a daemon thread, returns the server."""
+    # only processes that expose metrics pay for http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(
+        target=server.serve_forever,
+        name=f'metrics-{port}',
+        daemon=True,
+    )
+    thread.start()
+    return server
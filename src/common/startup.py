@@ -0,0 +1,76 @@
+"""Import time per module of an entry point, from `python -X importtime`.
+
+The module is imported in a fresh interpreter so nothing is cached:
+
+    poetry run python -m src.common.startup src.api
+    poetry run python -m src.common.startup schedule_tracking --top 40
+    poetry run python schedule_tracking.py --profile-startup
+"""
+import os
+import sys
+import subprocess
+
+import click
+
+
+def profile_imports(module, python=None):
+    """Imports `module` in a child interpreter.
+
+    Returns `(total_ms, rows)` with rows of `(module, self_ms,
+    cumulative_ms)`, slowest cumulative first.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.getcwd()] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else [])
+    )
+    # the marker leaves out what the interpreter imports before `module`
+    code = (
+        'import sys, time; sys.stderr.write("--start--\\n"); '
+        f't = time.perf_counter(); import {module}; '
+        'print(time.perf_counter() - t)'
+    )
+    result = subprocess.run(
+        [python or sys.executable, '-X', 'importtime', '-c', code],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise click.ClickException(
+            f'importing {module} failed:\n{result.stderr[-2000:]}'
+        )
+
+    lines = result.stderr.split('--start--\n', 1)[-1].splitlines()
+    rows = []
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us) / 1000,
+                     int(cumulative_us) / 1000))
+
+    rows.sort(key=lambda row: row[2], reverse=True)
+    total = float(result.stdout.strip().splitlines()[-1]) * 1000
+    return total, rows
+
+
+def format_profile(module, total, rows, top=25):
+    lines = [
+        f'import {module}: {total:.1f} ms, {len(rows)} modules',
+        f'{"cumulative ms":>14} {"self ms":>9}  module',
+    ]
+    for name, self_ms, cumulative_ms in rows[:top]:
+        lines.append(f'{cumulative_ms:>14.1f} {self_ms:>9.1f}  {name}')
+    return '\n'.join(lines)
+
+
+@click.command()
+@click.argument('module')
+@click.option('--top', default=25, show_default=True)
+def main(module, top):
+    total, rows = profile_imports(module)
+    click.echo(format_profile(module, total, rows, top))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,15 @@
 import logging
-import jwt
 import hashlib
 import math
 from uuid import uuid4
-from jinja2 import FileSystemLoader, BaseLoader, Environment as JinjaEnv
 from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from cryptography.fernet import Fernet
 
 from .constants import PAGINATION, ISO8601_DATETIME_RE
 
+# jwt, jinja2 and cryptography are imported by the helpers that use them,
+# they cost more at startup than everything else in this module
+
 log = logging.getLogger('easygds')
 
 
@@ -32,10 +32,12 @@ def log_data(mode: str,
              template: str = None,
              args: list = None,
              kwargs: dict = None):
-    if logger:
-        handler = getattr(logger, mode)
-    else:
-        handler = getattr(log, mode)
+    if not logger:
+        logger = log
+    # skip building the message when nothing would be emitted
+    if not logger.isEnabledFor(getattr(logging, mode.upper(), logging.ERROR)):
+        return
+    handler = getattr(logger, mode)
 
     if not args:
         args = []
@@ -59,6 +61,8 @@ def log_data(mode: str,
 
 
 def encrypt(string, secret_key):
+    from cryptography.fernet import Fernet
+
     if not isinstance(string, bytes):
         string = string.encode()
     fernet = Fernet(key=secret_key)
@@ -66,6 +70,8 @@ def encrypt(string, secret_key):
 
 
 def decrypt(token, secret_key):
+    from cryptography.fernet import Fernet
+
     if not isinstance(token, bytes):
         token = token.encode()
     fernet = Fernet(key=secret_key)
@@ -177,6 +183,8 @@ def iso_string_to_datetime(value: str, *args, **kwargs):
 
 
 def make_jwt_token(secret_key, expire_time=3600, **kwargs):
+    import jwt
+
     now = datetime.now()
 
     expire = now + timedelta(seconds=expire_time)
@@ -189,6 +197,8 @@ def make_jwt_token(secret_key, expire_time=3600, **kwargs):
 
 
 def decode_jwt_token(token, secret_key, verify_expire=False):
+    import jwt
+
     try:
         token_data = jwt.decode(token, secret_key,
                                 options={'verify_exp': verify_expire})
@@ -275,6 +285,8 @@ def find_in_list(array: list,
 
 
 def gen_html(content, data, template_dir=None):
+    from jinja2 import FileSystemLoader, BaseLoader, Environment as JinjaEnv
+
     if template_dir:
         loader = FileSystemLoader(template_dir)
     else:
@@ -1,4 +1,5 @@
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 
 from src.bases.databases.mongo import Mongo as BaseMongo
 
@@ -9,5 +10,6 @@ class Mongo(BaseMongo):
 
 __all__ = (
     'Redis',
+    'AsyncRedis',
     'Mongo'
 )
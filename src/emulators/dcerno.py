@@ -0,0 +1,332 @@
+"""D-Cerno central unit emulator speaking TCCP over TCP.
+
+Answers the `con` handshake, `gunits` and `gmicstat`, and pushes
+`micstat` frames to every connected client from a script or a random
+schedule. Writes can be delayed, coalesced and cut into small fragments
+to exercise the client decoder the way a busy network would.
+
+    poetry run python -m src.emulators.dcerno --units 200 --event-rate 50
+    poetry run python -m src.emulators.dcerno --script session.jsonl --loop
+    poetry run python -m src.emulators.dcerno --fragment 7 --delay 0.05
+
+A script is JSON lines of `{"t": seconds, "uid": ..., "stat": "0"|"1"}`;
+an `EventRecorder` log of a real session can be played as is.
+"""
+import json
+import time
+import random
+import socket
+import asyncio
+
+import click
+
+from src.clients.dcerno import DcernoSession, FrameDecoder
+
+NOTIFY_PACKET_TYPE = 'ntf'
+NOTIFY_PACKET_ID = '0000'
+
+
+def encode(packet_type, packet_id, body):
+    return DcernoSession.mapping_payload(
+        packet_type, packet_id, '02', json.dumps(body)
+    ).encode('utf-8')
+
+
+def load_script(path):
+    """Reads `(t, uid, stat)` steps from a script or a recorder log."""
+    steps = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            event = json.loads(line)
+            if event.get('e') == 'frame':
+                body = event.get('body') or dict()
+                if body.get('nam') != 'micstat':
+                    continue
+                steps.append((event['t'], body['uid'], body['stat']))
+            elif 'uid' in event:
+                steps.append((event['t'], event['uid'], event['stat']))
+    steps.sort(key=lambda step: step[0])
+    return steps
+
+
+class EmulatorConnection(object):
+    """One client connection with its own shaped write queue."""
+
+    def __init__(self, emulator, reader, writer):
+        self.emulator = emulator
+        self.reader = reader
+        self.writer = writer
+        self.decoder = FrameDecoder()
+        self.outbox = asyncio.Queue(maxsize=emulator.max_queue)
+        self.dropped = 0
+
+    def send(self, data):
+        try:
+            self.outbox.put_nowait(data)
+        except asyncio.QueueFull:
+            # a slow client loses pushes, like on the real unit
+            self.dropped += 1
+
+    async def _write_loop(self):
+        emulator = self.emulator
+        rnd = emulator.random
+        while True:
+            data = await self.outbox.get()
+            if emulator.coalesce:
+                await asyncio.sleep(emulator.coalesce)
+            chunks = [data]
+            while not self.outbox.empty():
+                chunks.append(self.outbox.get_nowait())
+            data = b''.join(chunks)
+
+            if emulator.delay or emulator.jitter:
+                await asyncio.sleep(
+                    emulator.delay + rnd.uniform(0, emulator.jitter)
+                )
+
+            if self.writer.is_closing():
+                return
+            try:
+                await self._write(data, rnd)
+            except (ConnectionError, OSError):
+                return
+
+    async def _write(self, data, rnd):
+        fragment = self.emulator.fragment
+        if not fragment:
+            self.writer.write(data)
+            await self.writer.drain()
+            return
+
+        # with TCP_NODELAY every write goes out as its own segment
+        position = 0
+        while position < len(data):
+            size = rnd.randint(1, fragment)
+            self.writer.write(data[position:position + size])
+            position += size
+        await self.writer.drain()
+
+    async def serve(self):
+        sock = self.writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        write_task = asyncio.ensure_future(self._write_loop())
+        try:
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    break
+                for frame in self.decoder.feed(data):
+                    self.send(self.emulator.handle(frame))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            write_task.cancel()
+            self.writer.close()
+
+
+class DcernoEmulator(object):
+    """Simulated central unit with `units` microphones.
+
+    Unit uids are `10001`, `10002`, ... All clients share the unit
+    states; a push is encoded once and queued to every connection.
+    """
+
+    def __init__(self,
+                 host='127.0.0.1',
+                 port=5011,
+                 units=40,
+                 script=None,
+                 loop_script=False,
+                 event_rate=0.0,
+                 max_active=4,
+                 delay=0.0,
+                 jitter=0.0,
+                 coalesce=0.0,
+                 fragment=0,
+                 max_queue=10000,
+                 seed=None):
+        self.host = host
+        self.port = port
+        self.script = script or []
+        self.loop_script = loop_script
+        self.event_rate = event_rate
+        self.max_active = max_active
+        self.delay = delay
+        self.jitter = jitter
+        self.coalesce = coalesce
+        self.fragment = fragment
+        self.max_queue = max_queue
+        self.random = random.Random(seed)
+
+        self.units = {str(10001 + i): '0' for i in range(units)}
+        self.connections = set()
+        self.stats = dict(connections=0, requests=0, pushes=0)
+        self._server = None
+        self._tasks = []
+
+    def unit(self, uid):
+        return dict(uid=uid, stat=self.units.get(uid, '0'))
+
+    def reply_body(self, frame):
+        if frame.packet_type == 'con':
+            return dict(nam='rep', typ='CentralUnit', ver='1.01')
+
+        body = frame.body if isinstance(frame.body, dict) else dict()
+        name = body.get('nam')
+        if name == 'gunits':
+            return dict(nam='units', s=[self.unit(uid) for uid in self.units])
+        if name == 'gmicstat':
+            uid = str(body.get('uid', '0'))
+            if uid == '0':
+                return dict(
+                    nam='micstat', s=[self.unit(uid) for uid in self.units]
+                )
+            return dict(nam='micstat', **self.unit(uid))
+        return dict(nam='error', msg=f'Unknown request: {name}')
+
+    def handle(self, frame):
+        self.stats['requests'] += 1
+        return encode('rep', frame.packet_id, self.reply_body(frame))
+
+    def push(self, uid, stat):
+        """Sets a unit state and notifies every client."""
+        self.units[uid] = stat
+        self.stats['pushes'] += 1
+        data = encode(
+            NOTIFY_PACKET_TYPE,
+            NOTIFY_PACKET_ID,
+            dict(nam='micstat', uid=uid, stat=stat),
+        )
+        for connection in self.connections:
+            connection.send(data)
+
+    async def _accept(self, reader, writer):
+        connection = EmulatorConnection(self, reader, writer)
+        self.connections.add(connection)
+        self.stats['connections'] += 1
+        try:
+            await connection.serve()
+        except asyncio.CancelledError:
+            # shutting down, end the handler quietly
+            pass
+        finally:
+            self.connections.discard(connection)
+
+    async def _play_script(self):
+        while True:
+            started = time.monotonic()
+            for t, uid, stat in self.script:
+                delay = started + t - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.push(uid, stat)
+            if not self.loop_script:
+                return
+
+    async def _play_random(self):
+        uids = list(self.units)
+        while True:
+            await asyncio.sleep(self.random.expovariate(self.event_rate))
+            active = [uid for uid, stat in self.units.items() if stat == '1']
+            if active and (len(active) >= self.max_active
+                           or self.random.random() < 0.5):
+                self.push(self.random.choice(active), '0')
+            else:
+                self.push(self.random.choice(uids), '1')
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._accept, self.host, self.port, backlog=1024
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.script:
+            self._tasks.append(asyncio.ensure_future(self._play_script()))
+        if self.event_rate > 0:
+            self._tasks.append(asyncio.ensure_future(self._play_random()))
+        return self
+
+    def drop_connections(self):
+        """Closes every client socket, as on a network outage."""
+        for connection in list(self.connections):
+            connection.writer.transport.abort()
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self._server is not None:
+            self._server.close()
+            for connection in list(self.connections):
+                connection.writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self, stats_interval=0):
+        await self.start()
+        print(f'D-Cerno emulator on {self.host}:{self.port}, '
+              f'{len(self.units)} units')
+        try:
+            while True:
+                await asyncio.sleep(stats_interval or 3600)
+                if stats_interval:
+                    dropped = sum(c.dropped for c in self.connections)
+                    print(json.dumps(dict(
+                        self.stats,
+                        clients=len(self.connections),
+                        dropped=dropped,
+                    )))
+        finally:
+            await self.close()
+
+
+@click.command()
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=5011, show_default=True)
+@click.option('--units', default=40, show_default=True)
+@click.option('--script', 'script_path', default=None,
+              type=click.Path(exists=True, dir_okay=False),
+              help='JSON lines of {t, uid, stat}, or a recorder log.')
+@click.option('--loop', 'loop_script', is_flag=True,
+              help='Restart the script when it ends.')
+@click.option('--event-rate', default=0.0, show_default=True,
+              help='Random micstat pushes per second.')
+@click.option('--max-active', default=4, show_default=True)
+@click.option('--delay', default=0.0, show_default=True,
+              help='Seconds added before every write.')
+@click.option('--jitter', default=0.0, show_default=True,
+              help='Random extra delay up to this many seconds.')
+@click.option('--coalesce', default=0.0, show_default=True,
+              help='Seconds to gather frames into one write.')
+@click.option('--fragment', default=0, show_default=True,
+              help='Cut writes into random pieces of at most N bytes.')
+@click.option('--stats-interval', default=10.0, show_default=True)
+@click.option('--seed', default=None, type=int)
+def main(host, port, units, script_path, loop_script, event_rate,
+         max_active, delay, jitter, coalesce, fragment, stats_interval,
+         seed):
+    emulator = DcernoEmulator(
+        host=host,
+        port=port,
+        units=units,
+        script=load_script(script_path) if script_path else None,
+        loop_script=loop_script,
+        event_rate=event_rate,
+        max_active=max_active,
+        delay=delay,
+        jitter=jitter,
+        coalesce=coalesce,
+        fragment=fragment,
+        seed=seed,
+    )
+    try:
+        asyncio.run(emulator.serve_forever(stats_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
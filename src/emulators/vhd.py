@@ -0,0 +1,281 @@
+"""VHD PTZ camera emulator for the CGI endpoints used by `VHDClient`.
+
+Serves `/cgi-bin/ptzctrl.cgi?ptzcmd&<action>&...` and
+`/cgi-bin/param.cgi?get_device_conf` with the camera's payloads. A move
+takes time proportional to the pan/tilt distance between positions, a new
+command interrupts the running move, and every command is recorded.
+Commands that would not move the camera are counted as redundant.
+
+    poetry run python -m src.emulators.vhd --port 8088 --cameras 2
+    poetry run python -m src.emulators.vhd --latency 0.05 --error-rate 0.02
+
+`GET /emulator/state` returns the counters and the position,
+`GET /emulator/commands` the recorded commands, `DELETE` on it resets them.
+"""
+import time
+import random
+import asyncio
+from collections import deque
+
+import click
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+HOME = (0.0, 0.0)
+
+
+class CameraEmulator(object):
+    """Position and command log of one emulated camera.
+
+    Presets that were never stored with `posset` get a fixed position
+    spread over the pan/tilt range, so a given preset pair always takes
+    the same time to travel.
+    """
+
+    def __init__(self,
+                 name='camera',
+                 latency=0.0,
+                 jitter=0.0,
+                 error_rate=0.0,
+                 fail_rate=0.0,
+                 pan_speed=100.0,
+                 tilt_speed=60.0,
+                 settle=0.2,
+                 max_commands=100000,
+                 seed=None):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fail_rate = fail_rate
+        self.pan_speed = pan_speed
+        self.tilt_speed = tilt_speed
+        self.settle = settle
+        self.random = random.Random(seed)
+
+        self.presets = dict()
+        self.commands = deque(maxlen=max_commands)
+        self.reset()
+
+    def reset(self):
+        self.commands.clear()
+        self.position = HOME
+        self.target = HOME
+        self.move_started_at = None
+        self.move_from = HOME
+        self.move_duration = 0
+        self.stats = dict(
+            commands=0,
+            moves=0,
+            redundant=0,
+            interrupted=0,
+            errors=0,
+            failures=0,
+        )
+
+    def preset_position(self, preset):
+        if preset in self.presets:
+            return self.presets[preset]
+        try:
+            number = int(preset)
+        except (TypeError, ValueError):
+            return None
+        return float(number * 37 % 340 - 170), float(number * 13 % 60 - 30)
+
+    def travel_time(self, start, end):
+        pan = abs(end[0] - start[0]) / self.pan_speed
+        tilt = abs(end[1] - start[1]) / self.tilt_speed
+        return max(pan, tilt) + self.settle
+
+    def current_position(self, now):
+        """Interpolates the position of a running move."""
+        if self.move_started_at is None:
+            return self.position
+        elapsed = now - self.move_started_at
+        if elapsed >= self.move_duration:
+            self.position = self.target
+            self.move_started_at = None
+            return self.position
+        ratio = elapsed / self.move_duration
+        return tuple(
+            start + (end - start) * ratio
+            for start, end in zip(self.move_from, self.target)
+        )
+
+    @property
+    def moving(self):
+        return self.move_started_at is not None and (
+            time.monotonic() - self.move_started_at < self.move_duration
+        )
+
+    def move(self, target, now):
+        """Starts a move, returns its duration or None when redundant."""
+        position = self.current_position(now)
+        if target == self.target:
+            return None
+        if self.move_started_at is not None:
+            self.stats['interrupted'] += 1
+        self.move_from = position
+        self.target = target
+        self.move_started_at = now
+        self.move_duration = self.travel_time(position, target)
+        self.stats['moves'] += 1
+        return self.move_duration
+
+    def execute(self, params):
+        """Runs a `ptzcmd` command, returns `(status_code, body)`."""
+        now = time.monotonic()
+        action = params[1] if len(params) > 1 else None
+        args = params[2:]
+        record = dict(
+            t=now,
+            action=action,
+            args=args,
+            status=200,
+            result='Success',
+            duration=None,
+            redundant=False,
+        )
+        self.commands.append(record)
+        self.stats['commands'] += 1
+
+        if self.random.random() < self.error_rate:
+            self.stats['errors'] += 1
+            record['status'] = 500
+            record['result'] = None
+            return 500, None
+        if self.random.random() < self.fail_rate:
+            self.stats['failures'] += 1
+            record['result'] = 'Failed'
+            return 200, dict(Response=dict(Result='Failed'))
+
+        target = None
+        if action == 'home':
+            target = HOME
+        elif action == 'poscall' and args:
+            target = self.preset_position(args[0])
+        elif action == 'posset' and args:
+            self.presets[args[0]] = self.current_position(now)
+
+        if target is None and action != 'posset':
+            record['result'] = 'Failed'
+            return 200, dict(Response=dict(Result='Failed'))
+
+        if target is not None:
+            duration = self.move(target, now)
+            if duration is None:
+                record['redundant'] = True
+                self.stats['redundant'] += 1
+            record['duration'] = duration
+        return 200, dict(Response=dict(Result='Success'))
+
+    def state(self):
+        return dict(
+            name=self.name,
+            position=self.current_position(time.monotonic()),
+            target=self.target,
+            moving=self.moving,
+            presets=len(self.presets),
+            **self.stats,
+        )
+
+
+def create_app(camera):
+    app = FastAPI(title=f'VHD emulator {camera.name}')
+
+    async def respond_later():
+        delay = camera.latency + camera.random.uniform(0, camera.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @app.get('/cgi-bin/ptzctrl.cgi')
+    async def ptzctrl(request: Request):
+        await respond_later()
+        params = request.url.query.split('&')
+        status_code, body = camera.execute(params)
+        if body is None:
+            return PlainTextResponse('Internal Server Error', status_code)
+        return JSONResponse(body, status_code)
+
+    @app.get('/cgi-bin/param.cgi')
+    async def param(request: Request):
+        await respond_later()
+        if request.url.query != 'get_device_conf':
+            return PlainTextResponse('Bad Request', 400)
+        return PlainTextResponse(
+            f'devname="{camera.name}"\n'
+            'devtype="VHD"\n'
+            'versioninfo="emulator"\n'
+        )
+
+    @app.get('/emulator/state')
+    async def state():
+        return camera.state()
+
+    @app.get('/emulator/commands')
+    async def commands():
+        return list(camera.commands)
+
+    @app.delete('/emulator/commands')
+    async def reset():
+        camera.reset()
+        return camera.state()
+
+    return app
+
+
+async def serve(cameras, host, port, limit_concurrency=None):
+    """Serves each camera on its own port, from `port` upwards."""
+    servers = []
+    for index, camera in enumerate(cameras):
+        config = uvicorn.Config(
+            create_app(camera),
+            host=host,
+            port=port + index,
+            limit_concurrency=limit_concurrency,
+            log_level='warning',
+        )
+        servers.append(uvicorn.Server(config))
+        print(f'{camera.name} on http://{host}:{port + index}')
+    await asyncio.gather(*[server.serve() for server in servers])
+
+
+@click.command()
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=8088, show_default=True)
+@click.option('--cameras', default=1, show_default=True,
+              help='Cameras to emulate, on consecutive ports.')
+@click.option('--latency', default=0.0, show_default=True,
+              help='Seconds before every response.')
+@click.option('--jitter', default=0.0, show_default=True)
+@click.option('--error-rate', default=0.0, show_default=True,
+              help='Share of commands answered with HTTP 500.')
+@click.option('--fail-rate', default=0.0, show_default=True,
+              help='Share of commands answered with Result Failed.')
+@click.option('--pan-speed', default=100.0, show_default=True,
+              help='Degrees per second.')
+@click.option('--tilt-speed', default=60.0, show_default=True)
+@click.option('--limit-concurrency', default=None, type=int,
+              help='Connections above this get HTTP 503.')
+@click.option('--seed', default=None, type=int)
+def main(host, port, cameras, latency, jitter, error_rate, fail_rate,
+         pan_speed, tilt_speed, limit_concurrency, seed):
+    emulators = [
+        CameraEmulator(
+            name=f'camera{index + 1}',
+            latency=latency,
+            jitter=jitter,
+            error_rate=error_rate,
+            fail_rate=fail_rate,
+            pan_speed=pan_speed,
+            tilt_speed=tilt_speed,
+            seed=None if seed is None else seed + index,
+        )
+        for index in range(cameras)
+    ]
+    asyncio.run(serve(emulators, host, port, limit_concurrency))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition, Lock, Thread
+
+from src.bases.error.base import BaseError
+from src.clients.vhd import VHDClient
+from src.common.utils import gen_uuid, get_now
+
+log = logging.getLogger(__name__)
+
+# longest pause accepted between two steps, in seconds
+MAX_WAIT = 600
+
+
+class CameraJob(object):
+    """A sequence of camera commands and pauses run in the background.
+
+    A step is either a command, `{"action": "poscall", "position": "2"}`
+    with optional `zoom`, or a pause, `{"wait": 5}`.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    FINISHED = (DONE, FAILED, CANCELLED)
+
+    def __init__(self, client, steps):
+        self.id = gen_uuid()
+        self.client = client
+        self.steps = steps
+        self.status = self.PENDING
+        # index of the next step to run
+        self.step = 0
+        self.results = []
+        self.error = None
+        self.created_at = get_now()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in self.FINISHED
+
+    def finish(self, status, error=None):
+        self.status = status
+        self.error = error
+        self.finished_at = get_now()
+
+    def to_dict(self):
+        return dict(
+            id=self.id,
+            camera=self.client.uri,
+            status=self.status,
+            step=self.step,
+            steps=self.steps,
+            results=self.results,
+            error=self.error,
+            created_at=self.created_at.isoformat(),
+            finished_at=(
+                self.finished_at.isoformat() if self.finished_at else None
+            ),
+        )
+
+
+def validate_steps(steps):
+    """Checks and normalizes job steps, raises `InvalidParams`."""
+    if not isinstance(steps, list) or not steps:
+        raise BaseError('InvalidParams', 'steps must be a non-empty list')
+
+    result = []
+    for index, step in enumerate(steps):
+        if not isinstance(step, dict):
+            raise BaseError('InvalidParams', f'step {index} is not an object')
+        if 'wait' in step:
+            wait = step['wait']
+            if (not isinstance(wait, (int, float)) or isinstance(wait, bool)
+                    or not 0 <= wait <= MAX_WAIT):
+                raise BaseError(
+                    'InvalidParams',
+                    f'step {index}: wait must be 0 to {MAX_WAIT} seconds'
+                )
+            result.append(dict(wait=wait))
+            continue
+        action = step.get('action')
+        if not action or not isinstance(action, str):
+            raise BaseError(
+                'InvalidParams', f'step {index} needs an action or a wait'
+            )
+        result.append(dict(
+            action=action,
+            position=None if step.get('position') is None
+            else str(step['position']),
+            zoom=None if step.get('zoom') is None else str(step['zoom']),
+        ))
+    return result
+
+
+class CameraJobs(object):
+    """Runs `CameraJob`s without blocking the caller.
+
+    One scheduler thread owns the timing: pauses are entries in a heap of
+    due times, not sleeping threads, so any number of jobs can wait at
+    once. Commands run on a small thread pool. A new job on a camera
+    cancels the camera's running job unless `replace` is False; a
+    cancelled job stops after the command in flight, if any.
+
+    Finished jobs are kept for `GET` until `max_jobs` is exceeded.
+    """
+
+    def __init__(self, max_workers=4, max_jobs=1000):
+        self.max_jobs = max_jobs
+        self._max_workers = max_workers
+        self._jobs = OrderedDict()
+        self._lock = Lock()
+        # (due, seq, job) ordered by monotonic due time
+        self._heap = []
+        self._seq = itertools.count()
+        self._wakeup = Condition(self._lock)
+        self._executor = None
+        self._thread = None
+
+    def _start(self):
+        # under `_lock`; nothing runs before the first job
+        if self._thread is None:
+            self._executor = ThreadPoolExecutor(
+                self._max_workers, thread_name_prefix='camera-job'
+            )
+            self._thread = Thread(
+                target=self._schedule_loop,
+                name='camera-jobs',
+                daemon=True,
+            )
+            self._thread.start()
+
+    def submit(self, uri, steps, logger=None, replace=True):
+        """Queues a job on the camera at `uri` and returns it at once."""
+        job = CameraJob(
+            VHDClient.shared(uri=uri, logger=logger),
+            validate_steps(steps),
+        )
+        with self._lock:
+            if replace:
+                for other in self._jobs.values():
+                    if other.client.uri == uri and not other.finished:
+                        other.finish(CameraJob.CANCELLED, 'Replaced.')
+            self._jobs[job.id] = job
+            self._evict()
+            self._start()
+            self._schedule(job, time.monotonic())
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancels a job, returns it or None when unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.finished:
+                job.finish(CameraJob.CANCELLED)
+        return job
+
+    def _evict(self):
+        if len(self._jobs) <= self.max_jobs:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.finished]:
+            del self._jobs[job_id]
+            if len(self._jobs) <= self.max_jobs:
+                break
+
+    def _schedule(self, job, due):
+        heapq.heappush(self._heap, (due, next(self._seq), job))
+        self._wakeup.notify()
+
+    def _schedule_loop(self):
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, job = heapq.heappop(self._heap)
+                    if not job.finished:
+                        self._executor.submit(self._run_steps, job)
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._wakeup.wait(timeout)
+
+    def _run_steps(self, job):
+        """Runs commands up to the next pause, which is scheduled."""
+        while True:
+            with self._lock:
+                if job.finished:
+                    return
+                if job.step >= len(job.steps):
+                    job.finish(CameraJob.DONE)
+                    return
+                job.status = CameraJob.RUNNING
+                step = job.steps[job.step]
+                job.step += 1
+                if 'wait' in step:
+                    self._schedule(job, time.monotonic() + step['wait'])
+                    return
+
+            try:
+                response = job.client.call(**step)
+            except Exception as e:
+                log.warning('Camera job %s failed: %s', job.id, e)
+                with self._lock:
+                    if not job.finished:
+                        job.finish(CameraJob.FAILED, str(e))
+                return
+            job.results.append(response)
+
+
+camera_jobs = CameraJobs()
@@ -0,0 +1,13 @@
+from src.bases.error.base import BaseError
+from config import API_CAMERAS
+
+# the first camera of the room, used when a request names none
+DEFAULT_CAMERA = next(iter(API_CAMERAS))
+
+
+def camera_uri(camera=None):
+    """URI of the camera id `camera`, raises `InvalidParams` if unknown."""
+    uri = API_CAMERAS.get(camera or DEFAULT_CAMERA)
+    if uri is None:
+        raise BaseError('InvalidParams', f'Unknown camera {camera}')
+    return uri
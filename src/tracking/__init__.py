@@ -0,0 +1,11 @@
+from .selectors import HOME, SpeakerSelector, DefaultSpeakerSelector
+from .tracker import RoomTracker
+from .orchestrator import Orchestrator
+
+__all__ = (
+    'RoomTracker',
+    'Orchestrator',
+    'SpeakerSelector',
+    'DefaultSpeakerSelector',
+    'HOME',
+)
@@ -0,0 +1,123 @@
+import os
+import time
+import asyncio
+
+from src.clients.dcerno import AsyncDcernoClient, LinkState
+from src.clients.vhd import AsyncVHDClient
+from src.common.backoff import Backoff
+from src.common.config_store import MappingStore, SettingsStore
+from .recorder import EventRecorder
+from .selectors import DefaultSpeakerSelector
+from .tracker import RoomTracker
+
+
+class Orchestrator(object):
+    """Runs one `RoomTracker` per configured room on a single event loop.
+
+    A room config looks like::
+
+        name: council
+        dcerno: {host: 192.168.0.20, port: 5011}
+        cameras: {left: http://192.168.0.88, right: http://192.168.0.89}
+        mapping_path: /path/to/mapping.json
+        setting_path: /path/to/settings.json
+        selector: {min_hold: 5, priority_uids: ['0001']}  # optional
+
+    Rooms are isolated: each has its own connection, cameras and retry
+    loop, so a failing room or a slow camera never stalls the others.
+
+    A room whose tracker fails is restarted after a jittered exponential
+    backoff (`tracking_config['backoff']`). The backoff starts over once
+    a connection stayed up for `stable_after` seconds, so a network blip
+    costs one short delay.
+
+    When `tracking_config['record_dir']` is set, each room writes an
+    `EventRecorder` log there that `replay.py` can play back.
+    """
+
+    def __init__(self,
+                 rooms,
+                 tracking_config=None,
+                 stable_after=1.0,
+                 logger=None):
+        self.rooms = rooms
+        self.tracking_config = tracking_config or dict()
+        self.stable_after = stable_after
+        self.logger = logger
+
+    def build_selector(self, room):
+        config = dict(self.tracking_config.get('selector') or dict())
+        config.update(room.get('selector') or dict())
+        return DefaultSpeakerSelector(**config)
+
+    def build_recorder(self, room):
+        record_dir = self.tracking_config.get('record_dir')
+        if not record_dir:
+            return None
+        os.makedirs(record_dir, exist_ok=True)
+        filename = '{}-{}.jsonl'.format(
+            room['name'], time.strftime('%Y%m%d-%H%M%S')
+        )
+        return EventRecorder(os.path.join(record_dir, filename))
+
+    def build_tracker(self, room):
+        dcerno = room['dcerno']
+        cameras = {
+            camera_id: AsyncVHDClient.shared(uri=uri, logger=self.logger)
+            for camera_id, uri in room['cameras'].items()
+        }
+        return RoomTracker(
+            name=room['name'],
+            dcerno_client=AsyncDcernoClient(
+                host=dcerno['host'],
+                port=dcerno['port'],
+                timeout=dcerno.get('timeout', 5),
+                heartbeat_interval=dcerno.get('heartbeat_interval', 2.0),
+                heartbeat_timeout=dcerno.get('heartbeat_timeout', 1.0),
+            ),
+            cameras=cameras,
+            mapping_store=MappingStore.for_path(room['mapping_path']),
+            settings_store=SettingsStore.for_path(room['setting_path']),
+            selector=self.build_selector(room),
+            mode=self.tracking_config.get('mode', 'event'),
+            reconcile_interval=self.tracking_config.get('reconcile_interval', 30),
+            poll_interval=self.tracking_config.get('poll_interval', 1),
+            recorder=self.build_recorder(room),
+            logger=self.logger,
+        )
+
+    async def run_room(self, room):
+        tracker = self.build_tracker(room)
+        client = tracker.dcerno_client
+        backoff = Backoff(**(self.tracking_config.get('backoff') or dict()))
+        try:
+            while True:
+                started = time.monotonic()
+                connects = client.link.connects
+                try:
+                    await tracker.run()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    uptime = time.monotonic() - started
+                    if (client.link.connects > connects
+                            and uptime >= self.stable_after):
+                        backoff.reset()
+                    delay = max(backoff.next(), client.retry_in())
+                    client.link.set(LinkState.BACKOFF)
+                    tracker.logger.warning(
+                        '[%s] Retry connection in %.2fs: %s',
+                        tracker.name, delay, e
+                    )
+                    await asyncio.sleep(delay)
+        finally:
+            if tracker.recorder is not None:
+                tracker.recorder.close()
+
+    async def run(self):
+        await asyncio.gather(*[
+            self.run_room(room) for room in self.rooms
+        ])
+
+    def start(self):
+        asyncio.run(self.run())
@@ -0,0 +1,81 @@
+import json
+import time
+from threading import Lock
+
+
+class EventRecorder(object):
+    """Append-only log of what a `RoomTracker` saw and did.
+
+    One compact JSON object per line, `t` is seconds since the recorder
+    was opened on the `time.monotonic()` clock:
+
+        {"t":0.0,"e":"start","room":"default","mapping":{...}}
+        {"t":1.25,"e":"frame","type":"ntf","id":"0000","body":{...}}
+        {"t":1.25,"e":"units","s":[...]}
+        {"t":1.26,"e":"cmd","camera":"main","action":"poscall","position":"3"}
+
+    Lines are buffered by the file object and flushed every
+    `flush_interval` seconds, so recording costs no syscall per frame.
+    """
+
+    def __init__(self, path, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.started_at = time.monotonic()
+
+        self._file = open(path, 'a', buffering=64 * 1024)
+        self._lock = Lock()
+        self._next_flush = self.started_at + flush_interval
+
+    def write(self, event, **fields):
+        now = time.monotonic()
+        record = dict(t=round(now - self.started_at, 6), e=event)
+        record.update(fields)
+        line = json.dumps(record, separators=(',', ':'))
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + '\n')
+            if now >= self._next_flush:
+                self._file.flush()
+                self._next_flush = now + self.flush_interval
+
+    def start(self, room, mapping):
+        self.write('start', room=room, mapping=mapping)
+
+    def frame(self, frame):
+        self.write(
+            'frame',
+            type=frame.packet_type,
+            id=frame.packet_id,
+            body=frame.body,
+        )
+
+    def units(self, units):
+        self.write('units', s=units)
+
+    def command(self, camera_id, action, position=None, zoom=None):
+        self.write(
+            'cmd',
+            camera=camera_id,
+            action=action,
+            position=position,
+            zoom=zoom,
+        )
+
+    def close(self):
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.close()
+            self._file = None
+
+
+def read_log(path):
+    """Yields the events of a recorder log, skipping a torn last line."""
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
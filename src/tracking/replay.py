@@ -0,0 +1,191 @@
+import time
+from concurrent.futures import Future
+
+from src.common.config_store import MappingStore
+from .recorder import read_log
+from .selectors import DefaultSpeakerSelector
+from .tracker import RoomTracker
+
+
+class ReplayMappingStore(MappingStore):
+    """A `MappingStore` over fixed data, no file behind it."""
+
+    def __init__(self, data):
+        super().__init__(path='<replay>')
+        self._data = data or dict()
+
+    def get(self):
+        return self._data
+
+    def replace(self, data):
+        self._data = data or dict()
+
+
+class ReplaySettings(object):
+    tracking_enabled = True
+
+
+class ReplayCamera(object):
+    """Stands in for `AsyncVHDClient`, commands complete at once."""
+
+    busy = False
+
+    def __init__(self, camera_id, sink):
+        self.camera_id = camera_id
+        self.sink = sink
+
+    def submit(self, action, position=None, zoom=None):
+        self.sink(self.camera_id, action, position, zoom)
+        future = Future()
+        future.set_result(None)
+        return future
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    index = int(round(p / 100 * len(values))) - 1
+    return values[min(len(values) - 1, max(0, index))]
+
+
+class ReplaySimulator(object):
+    """Feeds a recorder log through `RoomTracker` selection offline.
+
+    Events are applied at their recorded timestamps, selector timers fire
+    at their deadlines in between, so results do not depend on `speed`:
+    0 runs as fast as possible, 1 in real time, N at N times real time.
+
+    The latency of a switch is the time from the activation of the
+    framed microphone to the camera command.
+    """
+
+    def __init__(self, events, selector=None, mapping=None, speed=0):
+        self.events = list(events)
+        self.selector = selector or DefaultSpeakerSelector()
+        self.mapping = mapping
+        self.speed = speed
+
+        self.now = 0
+        self.activated_at = dict()
+        self.commands = []
+        self.latencies = []
+        self.tracker = None
+
+    def camera_ids(self):
+        camera_ids = []
+        for event in self.events:
+            if event['e'] == 'cmd' and event['camera'] not in camera_ids:
+                camera_ids.append(event['camera'])
+        return camera_ids or ['main']
+
+    def build_tracker(self):
+        mapping = self.mapping
+        if mapping is None:
+            mapping = next(
+                (e['mapping'] for e in self.events if e['e'] == 'start'),
+                dict()
+            )
+        return RoomTracker(
+            name='replay',
+            dcerno_client=None,
+            cameras={
+                camera_id: ReplayCamera(camera_id, self.on_command)
+                for camera_id in self.camera_ids()
+            },
+            mapping_store=ReplayMappingStore(mapping),
+            settings_store=ReplaySettings(),
+            selector=self.selector,
+        )
+
+    def on_command(self, camera_id, action, position, zoom):
+        target = self.tracker.current_active_micro
+        self.commands.append(dict(
+            t=self.now,
+            camera=camera_id,
+            action=action,
+            position=position,
+            target=target,
+        ))
+        activated = self.activated_at.get(target)
+        if action == 'poscall' and activated is not None:
+            self.latencies.append(self.now - activated)
+
+    def activate(self, uid, active):
+        if active:
+            self.activated_at.setdefault(uid, self.now)
+        else:
+            self.activated_at.pop(uid, None)
+
+    def wait_until(self, t, started_at):
+        if self.speed <= 0:
+            return
+        delay = started_at + t / self.speed - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def advance(self, t):
+        """Fires the selector timers due before `t`."""
+        while True:
+            deadline = self.selector.next_deadline(self.now)
+            if deadline is None or deadline > t:
+                break
+            self.now = deadline
+            self.tracker.evaluate(now=self.now)
+        self.now = max(self.now, t)
+
+    def apply(self, event):
+        kind = event['e']
+        if kind == 'start':
+            if self.mapping is None:
+                self.tracker.mapping_store.replace(event['mapping'])
+        elif kind == 'units':
+            for unit in event['s']:
+                self.activate(unit.get('uid'), unit.get('stat') == '1')
+            self.tracker.apply_units(event['s'], now=self.now)
+        elif kind == 'frame':
+            body = event['body']
+            # bodies that were not JSON are recorded as strings
+            if not isinstance(body, dict) or body.get('nam') != 'micstat':
+                return
+            self.activate(body.get('uid'), body.get('stat') == '1')
+            self.tracker.apply_micstat(
+                body.get('uid'), body.get('stat'), now=self.now
+            )
+        else:
+            return
+        self.tracker.evaluate(now=self.now)
+
+    def run(self):
+        self.tracker = self.build_tracker()
+        started_at = time.monotonic()
+        for event in self.events:
+            self.wait_until(event['t'], started_at)
+            self.advance(event['t'])
+            self.apply(event)
+        self.advance(float('inf'))
+        return self.report()
+
+    def report(self):
+        actions = dict()
+        for command in self.commands:
+            actions[command['action']] = actions.get(command['action'], 0) + 1
+        recorded = [e for e in self.events if e['e'] == 'cmd']
+        latencies = [round(v * 1000, 3) for v in self.latencies]
+        return dict(
+            events=len(self.events),
+            duration=self.events[-1]['t'] if self.events else 0,
+            commands=len(self.commands),
+            actions=actions,
+            recorded_commands=len(recorded),
+            latency_ms=dict(
+                p50=percentile(latencies, 50),
+                p90=percentile(latencies, 90),
+                p99=percentile(latencies, 99),
+                max=max(latencies) if latencies else None,
+            ),
+        )
+
+
+def replay_log(path, **kwargs):
+    return ReplaySimulator(read_log(path), **kwargs).run()
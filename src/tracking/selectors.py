@@ -0,0 +1,165 @@
+from src.bases.error.base import BaseError
+
+HOME = 'home'
+
+
+class SpeakerSelector(object):
+    """Decides which microphone the cameras should frame.
+
+    Selectors are driven by the timestamps passed in (`time.monotonic()`
+    in the tracker), never by loop ticks, so the same events replayed at
+    any speed give the same decisions.
+    """
+
+    def update(self, uid, active, now):
+        """Records a single microphone turning on or off."""
+        raise NotImplementedError
+
+    def reset(self, active_uids, now):
+        """Records a full snapshot of the active microphones."""
+        raise NotImplementedError
+
+    def select(self, now):
+        """Returns the uid to frame, or `HOME`."""
+        raise NotImplementedError
+
+    def next_deadline(self, now):
+        """Returns when `select` may change without a new event, or None."""
+        return None
+
+
+class DefaultSpeakerSelector(SpeakerSelector):
+    """Selection with hold time, priority and hysteresis.
+
+    - `min_active`: a microphone must stay on this long before it is
+      framed, so button taps and coughs cause no move.
+    - `min_hold`: a framed speaker is kept at least this long before
+      another one (except a priority one) takes the camera.
+    - `home_delay`: all microphones must be off this long before the
+      cameras return home.
+    - `priority_uids`: chairman and co., in order; an active one preempts
+      any other speaker and ignores `min_hold`.
+    - `mode`: `first` keeps the earliest activated speaker while it is on,
+      `last` switches to the most recently activated one.
+
+    With the defaults it behaves like the original tracker: the current
+    speaker is kept while active, else the first active one is framed.
+    """
+    MODES = ('first', 'last')
+
+    def __init__(self,
+                 min_active=0,
+                 min_hold=0,
+                 home_delay=0,
+                 priority_uids=None,
+                 mode='first'):
+        if mode not in self.MODES:
+            raise BaseError(
+                'InvalidParams',
+                f'Unsupported selection mode: {mode}'
+            )
+        self.min_active = min_active
+        self.min_hold = min_hold
+        self.home_delay = home_delay
+        self.priority_uids = list(priority_uids or [])
+        self.mode = mode
+
+        # uid -> activation time, ordered by activation
+        self.activated_at = dict()
+        self.current = HOME
+        self.selected_at = None
+        self.quiet_since = None
+
+    def update(self, uid, active, now):
+        if uid is None:
+            return
+        if active:
+            if uid not in self.activated_at:
+                self.activated_at[uid] = now
+            self.quiet_since = None
+            return
+
+        self.activated_at.pop(uid, None)
+        if not self.activated_at and self.quiet_since is None:
+            self.quiet_since = now
+
+    def reset(self, active_uids, now):
+        activated_at = dict()
+        for uid, activated in self.activated_at.items():
+            if uid in active_uids:
+                activated_at[uid] = activated
+        for uid in active_uids:
+            if uid not in activated_at:
+                activated_at[uid] = now
+        self.activated_at = activated_at
+
+        if activated_at:
+            self.quiet_since = None
+        elif self.quiet_since is None:
+            self.quiet_since = now
+
+    def eligible(self, now):
+        return [
+            uid for uid, activated in self.activated_at.items()
+            if activated + self.min_active <= now
+        ]
+
+    def _pick(self, candidates):
+        if self.mode == 'last':
+            return candidates[-1]
+        return candidates[0]
+
+    def _select(self, uid, now):
+        if uid != self.current:
+            self.current = uid
+            self.selected_at = now
+        return uid
+
+    def _holding(self, now):
+        return (self.current != HOME
+                and self.selected_at is not None
+                and now < self.selected_at + self.min_hold)
+
+    def select(self, now):
+        eligible = self.eligible(now)
+
+        if not eligible:
+            if self.current == HOME:
+                return HOME
+            if self.activated_at:
+                # someone is on but not for `min_active` yet
+                return self.current
+            if (self.quiet_since is not None
+                    and now < self.quiet_since + self.home_delay):
+                return self.current
+            return self._select(HOME, now)
+
+        priority = [uid for uid in self.priority_uids if uid in eligible]
+        if priority:
+            if self.current in priority:
+                return self.current
+            return self._select(priority[0], now)
+
+        if self.current in eligible:
+            if self.mode == 'last' and not self._holding(now):
+                return self._select(eligible[-1], now)
+            return self.current
+
+        if self._holding(now):
+            return self.current
+        return self._select(self._pick(eligible), now)
+
+    def next_deadline(self, now):
+        deadlines = [
+            activated + self.min_active
+            for activated in self.activated_at.values()
+        ]
+        if self.selected_at is not None:
+            deadlines.append(self.selected_at + self.min_hold)
+        if self.quiet_since is not None:
+            deadlines.append(self.quiet_since + self.home_delay)
+
+        deadlines = [d for d in deadlines if d > now]
+        if not deadlines:
+            return None
+        return min(deadlines)
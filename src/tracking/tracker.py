@@ -0,0 +1,248 @@
+import time
+import asyncio
+import logging
+
+from src.bases.error.base import BaseError
+from src.bases.error.client import ClientError
+from src.common.logging_handlers import LogSampler
+from src.clients.dcerno import LinkState
+from src.common.metrics import Counter
+from .selectors import HOME, DefaultSpeakerSelector
+
+CAMERA_SWITCHES = Counter(
+    'tracking_camera_switches_total',
+    'Camera commands sent by the tracker, by action.',
+    ('room', 'action'),
+)
+SELECTIONS = Counter(
+    'tracking_selections_total',
+    'Outcomes of evaluating the selected microphone.',
+    ('room', 'outcome'),
+)
+
+
+class RoomTracker(object):
+    """Points the PTZ cameras of one room at the active microphone.
+
+    In `event` mode the tracker reacts to every `micstat` frame pushed by
+    the central unit and only sends a `gunits` request every
+    `reconcile_interval` seconds to catch missed events. `poll` mode keeps
+    the original behaviour of requesting `gunits` every `poll_interval`
+    seconds.
+
+    Which microphone to frame is decided by `selector`, a
+    `SpeakerSelector`. A microphone can have presets on several cameras;
+    the next speaker is taken by a camera that is not live, so the cut
+    happens without a visible move. Camera commands are fired without
+    waiting for the camera, a slow camera never delays event handling.
+
+    With a `recorder` (an `EventRecorder`) every frame, snapshot and
+    camera command is logged so the session can be replayed offline.
+    """
+
+    def __init__(self,
+                 name,
+                 dcerno_client,
+                 cameras,
+                 mapping_store,
+                 settings_store,
+                 selector=None,
+                 mode='event',
+                 reconcile_interval=30,
+                 poll_interval=1,
+                 recorder=None,
+                 logger=None,
+                 tick_log_every=100):
+        if mode not in ('event', 'poll'):
+            raise BaseError(
+                'InvalidParams',
+                f'Unsupported tracking mode: {mode}'
+            )
+        self.name = name
+        self.dcerno_client = dcerno_client
+        # camera id -> AsyncVHDClient, in preference order
+        self.cameras = cameras
+        self.default_camera = next(iter(cameras))
+        self.mapping_store = mapping_store
+        self.settings_store = settings_store
+        self.selector = selector or DefaultSpeakerSelector()
+        self.mode = mode
+        self.reconcile_interval = reconcile_interval
+        self.poll_interval = poll_interval
+        self.recorder = recorder
+        self.logger = logger or logging.getLogger(__name__)
+        # the loop wakes every `poll_interval`, only log some of the ticks
+        self.tick_sampler = LogSampler(tick_log_every)
+
+        self.current_active_micro = HOME
+        self.live_camera = None
+        self._events = None
+
+    def apply_units(self, units, now=None):
+        """Applies a full `gunits` snapshot."""
+        if now is None:
+            now = time.monotonic()
+        self.selector.reset(
+            [unit['uid'] for unit in units if unit.get('stat') == '1'],
+            now
+        )
+
+    def apply_micstat(self, uid, stat, now=None):
+        """Applies one pushed `micstat` frame."""
+        if now is None:
+            now = time.monotonic()
+        self.selector.update(uid, stat == '1', now)
+
+    def pick_camera(self, candidates):
+        """Picks a camera among `candidates`, preferring one not live."""
+        free = [c for c in candidates if c != self.live_camera]
+        if not free:
+            return candidates[0]
+        idle = [c for c in free if not self.cameras[c].busy]
+        return (idle or free)[0]
+
+    def send(self, camera_id, action, position=None, zoom=None):
+        self.live_camera = camera_id
+        CAMERA_SWITCHES.labels(self.name, action).inc()
+        if self.recorder is not None:
+            self.recorder.command(camera_id, action, position, zoom)
+        future = self.cameras[camera_id].submit(
+            action, position=position, zoom=zoom
+        )
+        future.add_done_callback(self._command_done)
+        return future
+
+    def _command_done(self, future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self.logger.warning(
+                '[%s] camera command failed: %s', self.name, error
+            )
+
+    def evaluate(self, now=None):
+        """Moves a camera if the selected microphone changed."""
+        if now is None:
+            now = time.monotonic()
+        target = self.selector.select(now)
+
+        if not self.settings_store.tracking_enabled:
+            SELECTIONS.labels(self.name, 'disabled').inc()
+            return
+
+        if self.mapping_store.is_empty():
+            SELECTIONS.labels(self.name, 'unmapped').inc()
+            return
+
+        if target == self.current_active_micro:
+            SELECTIONS.labels(self.name, 'hold').inc()
+            return
+        self.current_active_micro = target
+
+        if target == HOME:
+            SELECTIONS.labels(self.name, 'home').inc()
+            self.send(
+                self.pick_camera(list(self.cameras)),
+                action='home',
+                position='10',
+                zoom='10',
+            )
+            return
+
+        targets = self.mapping_store.get_targets(target, self.default_camera)
+        targets = {c: p for c, p in targets.items() if c in self.cameras}
+        if not targets:
+            SELECTIONS.labels(self.name, 'no_preset').inc()
+            return
+        SELECTIONS.labels(self.name, 'switch').inc()
+        camera_id = self.pick_camera(list(targets))
+        self.logger.info(
+            '[%s] set %s active on %s', self.name, target, camera_id
+        )
+        self.send(
+            camera_id,
+            action='poscall',
+            position=str(targets[camera_id]),
+        )
+
+    async def reconcile(self):
+        data = await self.dcerno_client.get_all_units()
+        if self.recorder is not None:
+            self.recorder.units(data['s'])
+        self.apply_units(data['s'])
+
+    def _on_link(self, state, error):
+        if state != LinkState.CLOSED:
+            return
+        try:
+            # wakes `run` at once instead of at the next timeout
+            self._events.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+
+    def _on_frame(self, frame):
+        if self.recorder is not None:
+            self.recorder.frame(frame)
+        if frame.nam != 'micstat':
+            return
+        try:
+            self._events.put_nowait(frame.body)
+        except asyncio.QueueFull:
+            # the next reconciliation catches up on dropped events
+            pass
+
+    async def run(self):
+        self._events = asyncio.Queue(maxsize=1024)
+        self.dcerno_client.subscribe(self._on_frame)
+        self.dcerno_client.link.subscribe(self._on_link)
+        if self.recorder is not None:
+            self.recorder.start(self.name, self.mapping_store.copy())
+        try:
+            await self.dcerno_client.connect()
+            interval = self.reconcile_interval
+            if self.mode == 'poll':
+                interval = self.poll_interval
+
+            next_reconcile = 0
+            while True:
+                now = time.monotonic()
+                if now >= next_reconcile:
+                    await self.reconcile()
+                    self.evaluate()
+                    next_reconcile = now + interval
+                    continue
+
+                timeout = min(next_reconcile - now, self.poll_interval)
+                deadline = self.selector.next_deadline(now)
+                if deadline is not None:
+                    timeout = min(timeout, deadline - now)
+                try:
+                    events = [
+                        await asyncio.wait_for(self._events.get(), timeout)
+                    ]
+                except asyncio.TimeoutError:
+                    events = []
+                while not self._events.empty():
+                    events.append(self._events.get_nowait())
+
+                for event in events:
+                    # None is queued by `_on_link` when the link closes
+                    if event is not None:
+                        self.apply_micstat(event.get('uid'), event.get('stat'))
+                if self.dcerno_client.writer is None:
+                    raise ClientError(message='Connection to central unit lost.')
+                self.evaluate()
+                if (self.tick_sampler.ready()
+                        and self.logger.isEnabledFor(logging.DEBUG)):
+                    self.logger.debug('[%s] tick', self.name, extra=dict(
+                        data=dict(
+                            events=len(events),
+                            queued=self._events.qsize(),
+                            selected=self.current_active_micro,
+                            link=self.dcerno_client.link.state,
+                        )
+                    ))
+        finally:
+            self.dcerno_client.unsubscribe(self._on_frame)
+            self.dcerno_client.link.unsubscribe(self._on_link)